@@ -79,6 +79,11 @@ def readCommand(argv):
                     dest = 'noGraphics',
                     action = 'store_true',
                     help = 'No graphics display for pacman games.')
+    parser.add_option('--parallel',
+                    dest = 'parallel',
+                    type = 'int',
+                    default = 1,
+                    help = 'Run test cases in this many processes at once.')
     (options, args) = parser.parse_args(argv)
     return options
 
@@ -246,7 +251,7 @@ def getTestSubdirs(testParser, testRoot, questionToGrade):
 # evaluate student code
 def evaluate(generateSolutions, testRoot, moduleDict, exceptionMap=ERROR_HINT_MAP,
              edxOutput=False, muteOutput=False, gsOutput=False,
-            printTestCase=False, questionToGrade=None, display=None):
+            printTestCase=False, questionToGrade=None, display=None, parallel=1):
     # imports of testbench code.  note that the testClasses import must follow
     # the import of student code due to dependencies
     import testParser
@@ -254,6 +259,13 @@ def evaluate(generateSolutions, testRoot, moduleDict, exceptionMap=ERROR_HINT_MA
     for module in moduleDict:
         setattr(sys.modules[__name__], module, moduleDict[module])
 
+    runner = None
+    if parallel > 1:
+        if grading.ParallelTestRunner.isSupported():
+            runner = grading.ParallelTestRunner(parallel)
+        else:
+            print('Test cases need fork to run in parallel; running them one at a time.')
+
     questions = []
     questionDicts = {}
     test_subdirs = getTestSubdirs(testParser, testRoot, questionToGrade)
@@ -293,7 +305,10 @@ def evaluate(generateSolutions, testRoot, moduleDict, exceptionMap=ERROR_HINT_MA
                         return lambda grades: printTest(testDict, solutionDict) or testCase.execute(grades, moduleDict, solutionDict)
                     else:
                         return lambda grades: testCase.execute(grades, moduleDict, solutionDict)
-            question.addTestCase(testCase, makefun(testCase, solution_file))
+            thunk = makefun(testCase, solution_file)
+            if runner != None:
+                thunk = runner.addTestCase(q, thunk)
+            question.addTestCase(testCase, thunk)
 
         # Note extra function is necessary for scoping reasons
         def makefun(question):
@@ -308,7 +323,19 @@ def evaluate(generateSolutions, testRoot, moduleDict, exceptionMap=ERROR_HINT_MA
             for prereq in questionDicts[q].get('depends', '').split():
                 grades.addPrereq(q, prereq)
 
-    grades.grade(sys.modules[__name__], bonusPic = projectParams.BONUS_PIC)
+    if runner == None:
+        grades.grade(sys.modules[__name__], bonusPic = projectParams.BONUS_PIC)
+        return grades.points
+
+    # Questions without prerequisites start at once; the others start when
+    # grades reaches them.  Each test case has its own timeout instead.
+    for q in grades.questions:
+        if len(grades.prereqs[q]) == 0:
+            runner.startQuestion(q)
+    try:
+        grades.grade(sys.modules[__name__], bonusPic = projectParams.BONUS_PIC, questionTimeout = None)
+    finally:
+        runner.close()
     return grades.points
 
 
@@ -355,4 +382,5 @@ if __name__ == '__main__':
         evaluate(options.generateSolutions, options.testRoot, moduleDict,
             gsOutput=options.gsOutput,
             edxOutput=options.edxOutput, muteOutput=options.muteOutput, printTestCase=options.printTestCase,
-            questionToGrade=options.gradeQuestion, display=getDisplay(options.gradeQuestion!=None, options))
+            questionToGrade=options.gradeQuestion, display=getDisplay(options.gradeQuestion!=None, options),
+            parallel=options.parallel)
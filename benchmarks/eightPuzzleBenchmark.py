@@ -0,0 +1,127 @@
+# eightPuzzleBenchmark.py
+# -----------------------
+# Measures breadth-first search nodes per second on EightPuzzleSearchProblem,
+# comparing the packed-int EightPuzzleState with the list-of-lists version it
+# replaced.  Each search starts from one EIGHT_PUZZLE_DATA entry and runs
+# until the goal is dequeued.
+#
+# > python benchmarks/eightPuzzleBenchmark.py
+# > python benchmarks/eightPuzzleBenchmark.py --puzzles 1,2 --repeats 3
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import eightpuzzle
+import util
+
+class ListEightPuzzleState:
+    "The original EightPuzzleState, which keeps the tiles in a list of lists."
+
+    def __init__( self, numbers ):
+        self.cells = []
+        numbers = numbers[:] # Make a copy so as not to cause side-effects.
+        numbers.reverse()
+        for row in range( 3 ):
+            self.cells.append( [] )
+            for col in range( 3 ):
+                self.cells[row].append( numbers.pop() )
+                if self.cells[row][col] == 0:
+                    self.blankLocation = row, col
+
+    def isGoal( self ):
+        current = 0
+        for row in range( 3 ):
+            for col in range( 3 ):
+                if current != self.cells[row][col]:
+                    return False
+                current += 1
+        return True
+
+    def legalMoves( self ):
+        moves = []
+        row, col = self.blankLocation
+        if(row != 0):
+            moves.append('up')
+        if(row != 2):
+            moves.append('down')
+        if(col != 0):
+            moves.append('left')
+        if(col != 2):
+            moves.append('right')
+        return moves
+
+    def result(self, move):
+        row, col = self.blankLocation
+        if(move == 'up'):
+            newrow = row - 1
+            newcol = col
+        elif(move == 'down'):
+            newrow = row + 1
+            newcol = col
+        elif(move == 'left'):
+            newrow = row
+            newcol = col - 1
+        elif(move == 'right'):
+            newrow = row
+            newcol = col + 1
+        newPuzzle = ListEightPuzzleState([0, 0, 0, 0, 0, 0, 0, 0, 0])
+        newPuzzle.cells = [values[:] for values in self.cells]
+        newPuzzle.cells[row][col] = self.cells[newrow][newcol]
+        newPuzzle.cells[newrow][newcol] = self.cells[row][col]
+        newPuzzle.blankLocation = newrow, newcol
+        return newPuzzle
+
+    def __eq__(self, other):
+        for row in range( 3 ):
+            if self.cells[row] != other.cells[row]:
+                return False
+        return True
+
+    def __hash__(self):
+        return hash(str(self.cells))
+
+def breadthFirstNodes(problem):
+    "Returns the number of nodes dequeued by a graph BFS up to the goal"
+    closed = set()
+    frontier = util.Queue()
+    frontier.push(problem.getStartState())
+    nodes = 0
+    while not frontier.isEmpty():
+        state = frontier.pop()
+        if state in closed: continue
+        closed.add(state)
+        nodes += 1
+        if problem.isGoalState(state): break
+        for child, action, cost in problem.expand(state):
+            if child not in closed:
+                frontier.push(child)
+    return nodes
+
+def nodesPerSecond(stateClass, numbers, repeats):
+    nodes = 0
+    start = time.perf_counter()
+    for i in range(repeats):
+        problem = eightpuzzle.EightPuzzleSearchProblem(stateClass(list(numbers)))
+        nodes += breadthFirstNodes(problem)
+    return nodes / repeats, nodes / (time.perf_counter() - start)
+
+def runBenchmark(puzzles, repeats):
+    variants = [('lists', ListEightPuzzleState), ('packed', eightpuzzle.EightPuzzleState)]
+    print('%-7s %-8s %8s %14s' % ('puzzle', 'state', 'nodes', 'nodes/sec'))
+    for puzzleNumber in puzzles:
+        for name, stateClass in variants:
+            nodes, rate = nodesPerSecond(stateClass, eightpuzzle.EIGHT_PUZZLE_DATA[puzzleNumber], repeats)
+            print('%-7d %-8s %8d %14.0f' % (puzzleNumber, name, nodes, rate))
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option('--puzzles', dest='puzzles',
+                      default=','.join([str(i) for i in range(len(eightpuzzle.EIGHT_PUZZLE_DATA))]),
+                      help='Comma-separated EIGHT_PUZZLE_DATA indices [Default: %default]')
+    parser.add_option('--repeats', dest='repeats', type='int', default=1,
+                      help='Searches per puzzle and state class [Default: %default]')
+    options, _ = parser.parse_args()
+    runBenchmark([int(p) for p in options.puzzles.split(',')], options.repeats)
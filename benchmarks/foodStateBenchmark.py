@@ -0,0 +1,67 @@
+# foodStateBenchmark.py
+# ---------------------
+# Compares the memory and expansion rate of FoodSearchProblem states (a full
+# Grid copy per child) with CompactFoodSearchProblem states (interned
+# BitGrids).  Each run expands states in breadth-first order while keeping a
+# closed set, which is the memory profile of a graph search, and measures the
+# Python heap with tracemalloc.
+#
+# > python benchmarks/foodStateBenchmark.py
+# > python benchmarks/foodStateBenchmark.py --layouts trickySearch --nodes 50000
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import layout
+import pacman
+import searchAgents
+import util
+
+def expandStates(problem, maxNodes):
+    "Expands up to maxNodes distinct states breadth-first; returns the closed set"
+    closed = set()
+    frontier = util.Queue()
+    frontier.push(problem.getStartState())
+    while not frontier.isEmpty() and len(closed) < maxNodes:
+        state = frontier.pop()
+        if state in closed: continue
+        closed.add(state)
+        for child, action, cost in problem.expand(state):
+            if child not in closed:
+                frontier.push(child)
+    return closed
+
+def measure(problemClass, gameState, maxNodes):
+    tracemalloc.start()
+    start = time.perf_counter()
+    problem = problemClass(gameState)
+    closed = expandStates(problem, maxNodes)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return problem._expanded, elapsed, peak
+
+def runBenchmark(layoutNames, maxNodes):
+    print('%-14s %-26s %10s %14s %16s' % ('layout', 'problem', 'expanded', 'expanded/sec', 'peak bytes/node'))
+    for name in layoutNames:
+        lay = layout.getLayout(name)
+        gameState = pacman.GameState()
+        gameState.initialize(lay, 0)
+        for problemClass in [searchAgents.FoodSearchProblem, searchAgents.CompactFoodSearchProblem]:
+            expanded, elapsed, peak = measure(problemClass, gameState, maxNodes)
+            print('%-14s %-26s %10d %14.0f %16.1f' % (name, problemClass.__name__, expanded,
+                                                      expanded / elapsed, peak / float(max(expanded, 1))))
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option('--layouts', dest='layouts', default='trickySearch,bigSearch',
+                      help='Comma separated layout names [Default: %default]')
+    parser.add_option('--nodes', dest='nodes', type='int', default=20000,
+                      help='Number of states to expand per run [Default: %default]')
+    options, _ = parser.parse_args()
+    runBenchmark(options.layouts.split(','), options.nodes)
@@ -0,0 +1,64 @@
+# fullGameBenchmark.py
+# --------------------
+# Measures whole-game throughput: seeded games between a GreedyAgent and
+# random ghosts, played through ClassicGameRules and Game.run without
+# graphics.  Each game is played with the cached food count, with the
+# count checked against the grid on every lookup (the cost of the old full
+# scan, plus the comparison), and with food kept in a BitGrid.
+#
+# > python benchmarks/fullGameBenchmark.py
+# > python benchmarks/fullGameBenchmark.py --layout mediumClassic --games 10
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import ghostAgents
+import layout
+import pacman
+import pacmanAgents
+import textDisplay
+from game import GameStateData
+
+VARIANTS = [('cached count', False, False),
+            ('checked count', True, False),
+            ('food bits', False, True)]
+
+def playGames(lay, games, seed):
+    "Returns the number of moves made in 'games' seeded games"
+    rules = pacman.ClassicGameRules()
+    moves = 0
+    for i in range(games):
+        random.seed('%s-%d' % (seed, i))
+        ghosts = [ghostAgents.RandomGhost(index + 1) for index in range(lay.getNumGhosts())]
+        game = rules.newGame(lay, pacmanAgents.GreedyAgent(), ghosts, textDisplay.NullGraphics(), True)
+        game.run()
+        moves += len(game.moveHistory)
+    return moves
+
+def runBenchmark(layoutName, games, seed):
+    lay = layout.getLayout(layoutName)
+    print('%-16s %-14s %8s %12s' % ('layout', 'food', 'moves', 'moves/sec'))
+    for name, checkFoodCount, useFoodBits in VARIANTS:
+        GameStateData.checkFoodCount = checkFoodCount
+        GameStateData.useFoodBits = useFoodBits
+        start = time.perf_counter()
+        moves = playGames(lay, games, seed)
+        print('%-16s %-14s %8d %12.0f' % (layoutName, name, moves, moves / (time.perf_counter() - start)))
+    GameStateData.checkFoodCount = False
+    GameStateData.useFoodBits = False
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option('--layout', dest='layout', default='originalClassic',
+                      help='Layout to play on [Default: %default]')
+    parser.add_option('--games', dest='games', type='int', default=5,
+                      help='Number of games per variant [Default: %default]')
+    parser.add_option('--seed', dest='seed', default='cs188',
+                      help='Seed the games are derived from [Default: %default]')
+    options, _ = parser.parse_args()
+    runBenchmark(options.layout, options.games, options.seed)
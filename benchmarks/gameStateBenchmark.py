@@ -0,0 +1,77 @@
+# gameStateBenchmark.py
+# ---------------------
+# Measures GameState.generateChild calls per second with a GreedyAgent-style
+# lookahead: at every Pacman turn of a random game, each legal Pacman move is
+# expanded and then every ghost reply to it, one ply per ghost.  Also times
+# the deepCopy that Game.run makes for each agent on every move.
+#
+# > python benchmarks/gameStateBenchmark.py
+# > python benchmarks/gameStateBenchmark.py --layout originalClassic --games 5
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import layout
+import pacman
+
+def lookahead(state):
+    "Expands each Pacman move and the ghosts' replies; returns the calls made"
+    calls = 0
+    frontier = [state]
+    for agentIndex in range(state.getNumAgents()):
+        children = []
+        for parent in frontier:
+            if parent.isWin() or parent.isLose(): continue
+            for action in parent.getLegalActions(agentIndex):
+                children.append(parent.generateChild(agentIndex, action))
+                calls += 1
+        frontier = children
+    return calls
+
+def playRandomGames(lay, games, seed):
+    "Returns the states on which Pacman moves in random games"
+    random.seed(seed)
+    states = []
+    for i in range(games):
+        state = pacman.GameState()
+        state.initialize(lay, lay.getNumGhosts())
+        agentIndex = 0
+        while not (state.isWin() or state.isLose()):
+            if agentIndex == 0: states.append(state)
+            state = state.generateChild(agentIndex, random.choice(state.getLegalActions(agentIndex)))
+            agentIndex = (agentIndex + 1) % state.getNumAgents()
+    return states
+
+def runBenchmark(layoutName, games, seed):
+    lay = layout.getLayout(layoutName)
+    states = playRandomGames(lay, games, seed)
+
+    start = time.perf_counter()
+    calls = 0
+    for state in states:
+        calls += lookahead(state)
+    lookaheadRate = calls / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for state in states:
+        state.deepCopy()
+    deepCopyRate = len(states) / (time.perf_counter() - start)
+
+    print('%-16s %8s %18s %14s' % ('layout', 'states', 'generateChild/sec', 'deepCopy/sec'))
+    print('%-16s %8d %18.0f %14.0f' % (layoutName, len(states), lookaheadRate, deepCopyRate))
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option('--layout', dest='layout', default='mediumClassic',
+                      help='Layout to play on [Default: %default]')
+    parser.add_option('--games', dest='games', type='int', default=3,
+                      help='Number of random games to sample states from [Default: %default]')
+    parser.add_option('--seed', dest='seed', type='int', default=0,
+                      help='Random seed for the games [Default: %default]')
+    options, _ = parser.parse_args()
+    runBenchmark(options.layout, options.games, options.seed)
@@ -0,0 +1,101 @@
+# positionProblemBenchmark.py
+# ---------------------------
+# Measures PositionSearchProblem.expand calls per second, comparing the
+# table-driven expand with the original getActions/getNextState/getActionCost
+# implementation.  Each pass expands every reachable cell once, breadth-first.
+#
+# > python benchmarks/positionProblemBenchmark.py
+# > python benchmarks/positionProblemBenchmark.py --layout mediumMaze --passes 20
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import layout
+import pacman
+import searchAgents
+import util
+from game import Actions, Directions
+
+class UntabledPositionSearchProblem(searchAgents.PositionSearchProblem):
+    "PositionSearchProblem with the expand/getActions/getNextState it used to have."
+
+    def expand(self, state):
+        children = []
+        for action in self.getActions(state):
+            nextState = self.getNextState(state, action)
+            cost = self.getActionCost(state, action, nextState)
+            children.append( ( nextState, action, cost) )
+        self._expanded += 1
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+        return children
+
+    def getActions(self, state):
+        valid_actions_from_state = []
+        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+            x, y = state
+            dx, dy = Actions.directionToVector(action)
+            nextx, nexty = int(x + dx), int(y + dy)
+            if not self.walls[nextx][nexty]:
+                valid_actions_from_state.append(action)
+        return valid_actions_from_state
+
+    def getActionCost(self, state, action, next_state):
+        assert next_state == self.getNextState(state, action), (
+            "Invalid next state passed to getActionCost().")
+        return self.costFn(next_state)
+
+    def getNextState(self, state, action):
+        assert action in self.getActions(state), (
+            "Invalid action passed to getActionCost().")
+        x, y = state
+        dx, dy = Actions.directionToVector(action)
+        nextx, nexty = int(x + dx), int(y + dy)
+        return (nextx, nexty)
+
+def expandAll(problem):
+    "Expands every cell reachable from the start state once"
+    closed = set()
+    frontier = util.Queue()
+    frontier.push(problem.getStartState())
+    while not frontier.isEmpty():
+        state = frontier.pop()
+        if state in closed: continue
+        closed.add(state)
+        for child, action, cost in problem.expand(state):
+            if child not in closed:
+                frontier.push(child)
+
+def expansionsPerSecond(problemFactory, passes):
+    expanded = 0
+    start = time.perf_counter()
+    for i in range(passes):
+        problem = problemFactory()
+        expandAll(problem)
+        expanded += problem._expanded
+    return expanded / (time.perf_counter() - start)
+
+def runBenchmark(layoutName, passes):
+    lay = layout.getLayout(layoutName)
+    gameState = pacman.GameState()
+    gameState.initialize(lay, 0)
+    options = dict(warn=False, visualize=False)
+    variants = [('original expand', lambda: UntabledPositionSearchProblem(gameState, **options)),
+                ('successor table', lambda: searchAgents.PositionSearchProblem(gameState, **options))]
+    print('%-10s %-18s %16s' % ('layout', 'expand', 'expansions/sec'))
+    for name, factory in variants:
+        print('%-10s %-18s %16.0f' % (layoutName, name, expansionsPerSecond(factory, passes)))
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option('--layout', dest='layout', default='bigMaze',
+                      help='Layout to expand [Default: %default]')
+    parser.add_option('--passes', dest='passes', type='int', default=50,
+                      help='Number of full expansions of the maze [Default: %default]')
+    options, _ = parser.parse_args()
+    runBenchmark(options.layout, options.passes)
@@ -0,0 +1,57 @@
+# priorityQueueBenchmark.py
+# -------------------------
+# Micro-benchmark for the decrease-key (update) operation of the priority
+# queues in util.py.
+#
+# > python benchmarks/priorityQueueBenchmark.py
+# > python benchmarks/priorityQueueBenchmark.py --sizes 100000 --updates 50000
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import util
+
+QUEUES = [('PriorityQueue', util.PriorityQueue),
+          ('IndexedPriorityQueue', util.IndexedPriorityQueue),
+          ('LazyPriorityQueue', util.LazyPriorityQueue)]
+
+def fillQueue(queueClass, size, rng):
+    queue = queueClass()
+    for item in range(size):
+        queue.push(item, rng.randint(size, 2 * size))
+    return queue
+
+def timeUpdates(queue, size, numUpdates, rng):
+    "Lowers the priority of numUpdates random items and returns updates per second"
+    targets = [(rng.randrange(size), rng.randint(0, size)) for i in range(numUpdates)]
+    start = time.perf_counter()
+    for item, priority in targets:
+        queue.update(item, priority)
+    elapsed = time.perf_counter() - start
+    return numUpdates / elapsed if elapsed > 0 else float('inf')
+
+def runBenchmark(sizes, numUpdates, linearUpdates, seed=0):
+    print('%-22s %10s %10s %16s' % ('queue', 'frontier', 'updates', 'updates/sec'))
+    for size in sizes:
+        for name, queueClass in QUEUES:
+            rng = random.Random(seed)
+            queue = fillQueue(queueClass, size, rng)
+            # The list-scanning PriorityQueue is O(n) per update; keep its run short.
+            count = linearUpdates if queueClass is util.PriorityQueue else numUpdates
+            rate = timeUpdates(queue, size, count, rng)
+            print('%-22s %10d %10d %16.0f' % (name, size, count, rate))
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option('--sizes', dest='sizes', default='100000,1000000',
+                      help='Comma separated frontier sizes [Default: %default]')
+    parser.add_option('--updates', dest='updates', type='int', default=100000,
+                      help='Number of updates per indexed/lazy run [Default: %default]')
+    parser.add_option('--linearUpdates', dest='linearUpdates', type='int', default=20,
+                      help='Number of updates for the list-scanning PriorityQueue [Default: %default]')
+    options, _ = parser.parse_args()
+    runBenchmark([int(s) for s in options.sizes.split(',')], options.updates, options.linearUpdates)
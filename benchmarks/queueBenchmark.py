@@ -0,0 +1,59 @@
+# queueBenchmark.py
+# -----------------
+# Compares the deque-backed util.Queue with the list-backed queue it replaced,
+# filling and then draining a FIFO frontier of increasing size.
+#
+# > python benchmarks/queueBenchmark.py
+# > python benchmarks/queueBenchmark.py --sizes 1000,10000 --maxLegacy 10000
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import util
+
+class ListQueue:
+    "The original util.Queue, which inserts at the front of a list."
+    def __init__(self):
+        self.list = []
+
+    def push(self,item):
+        self.list.insert(0,item)
+
+    def pop(self):
+        return self.list.pop()
+
+    def isEmpty(self):
+        return len(self.list) == 0
+
+def timeFillAndDrain(queueClass, size):
+    "Returns the seconds needed to push and then pop 'size' items"
+    queue = queueClass()
+    start = time.perf_counter()
+    for item in range(size):
+        queue.push(item)
+    while not queue.isEmpty():
+        queue.pop()
+    return time.perf_counter() - start
+
+def runBenchmark(sizes, maxLegacy):
+    print('%10s %14s %14s %10s' % ('frontier', 'list (s)', 'deque (s)', 'speedup'))
+    for size in sizes:
+        new = timeFillAndDrain(util.Queue, size)
+        if size <= maxLegacy:
+            old = timeFillAndDrain(ListQueue, size)
+            print('%10d %14.4f %14.4f %9.1fx' % (size, old, new, old / new))
+        else:
+            print('%10d %14s %14.4f %10s' % (size, 'skipped', new, '-'))
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option('--sizes', dest='sizes', default='1000,10000,100000,1000000',
+                      help='Comma separated frontier sizes [Default: %default]')
+    # The list queue needs several minutes at 10^6; pass --maxLegacy 1000000 to include it.
+    parser.add_option('--maxLegacy', dest='maxLegacy', type='int', default=100000,
+                      help='Largest size to run the quadratic list queue on [Default: %default]')
+    options, _ = parser.parse_args()
+    runBenchmark([int(s) for s in options.sizes.split(',')], options.maxLegacy)
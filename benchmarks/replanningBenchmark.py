@@ -0,0 +1,99 @@
+# replanningBenchmark.py
+# ----------------------
+# Counts the search nodes expanded while an agent walks to a fixed goal and
+# the step costs around it keep changing, as when ghosts near Pacman make
+# the cells they cover expensive.  After every step the cells within a small
+# radius of the agent are re-penalised at random, and the path is replanned
+# twice from the same position: once with a fresh aStarSearch and once by
+# the search.DStarLite planner that is kept for the whole walk.  Both must
+# find paths of the same cost.
+#
+# > python benchmarks/replanningBenchmark.py
+# > python benchmarks/replanningBenchmark.py --layouts bigMaze --radius 3 --penalty 50
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import layout
+import pacman
+import search
+import searchAgents
+import util
+from game import Actions
+
+def makeProblem(gameState, penalties, start):
+    return searchAgents.PositionSearchProblem(gameState, costFn=lambda cell: penalties.get(cell, 1),
+                                              start=start, warn=False, visualize=False)
+
+def nearbyCells(walls, position, radius):
+    x, y = position
+    return [(x + dx, y + dy) for dx in range(-radius, radius + 1) for dy in range(-radius, radius + 1)
+            if abs(dx) + abs(dy) <= radius and 0 <= x + dx < walls.width and 0 <= y + dy < walls.height
+            and not walls[x + dx][y + dy]]
+
+def walk(layoutName, radius, penalty, seed):
+    "Walks to the goal; returns (steps, fresh expansions, D* Lite expansions, fresh s, D* Lite s)"
+    lay = layout.getLayout(layoutName)
+    gameState = pacman.GameState()
+    gameState.initialize(lay, 0)
+    rng = random.Random(seed)
+    penalties = {}
+    problem = makeProblem(gameState, penalties, None)
+    goal = problem.goal
+    planner = search.DStarLite(problem, util.manhattanDistance)
+    heuristic = lambda cell, p: util.manhattanDistance(cell, goal)
+    position = problem.getStartState()
+    steps, freshExpanded, freshTime, plannerTime = 0, 0, 0.0, 0.0
+    while position != goal:
+        start = time.perf_counter()
+        actions = planner.getPlan()
+        cost = planner.getCost()
+        plannerTime += time.perf_counter() - start
+
+        fresh = makeProblem(gameState, penalties, position)
+        start = time.perf_counter()
+        freshActions = search.aStarSearch(fresh, heuristic)
+        freshTime += time.perf_counter() - start
+        freshExpanded += fresh._expanded
+        assert fresh.getCostOfActionSequence(freshActions) == cost, 'D* Lite and A* disagree'
+
+        dx, dy = Actions.directionToVector(actions[0])
+        position = (int(position[0] + dx), int(position[1] + dy))
+        steps += 1
+        changed = set(penalties)
+        penalties.clear()
+        for cell in nearbyCells(lay.walls, position, radius):
+            if cell != goal and rng.random() < 0.5:
+                penalties[cell] = penalty
+        changed.update(penalties)
+        start = time.perf_counter()
+        planner.moveStart(position)
+        planner.updateCosts(changed)
+        plannerTime += time.perf_counter() - start
+    return steps, freshExpanded, planner.expansions, freshTime, plannerTime
+
+def runBenchmark(layoutNames, radius, penalty, seed):
+    print('%-18s %6s %12s %12s %9s %9s' % ('layout', 'steps', 'astar exp', 'dstar exp', 'astar s', 'dstar s'))
+    for layoutName in layoutNames:
+        steps, freshExpanded, plannerExpanded, freshTime, plannerTime = walk(layoutName, radius, penalty, seed)
+        print('%-18s %6d %12d %12d %9.3f %9.3f' %
+              (layoutName, steps, freshExpanded, plannerExpanded, freshTime, plannerTime))
+        sys.stdout.flush()
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option('--layouts', dest='layouts', default='tinyMaze,mediumMaze,bigMaze,openMaze,contoursMaze',
+                      help='Comma-separated single-goal mazes to walk [Default: %default]')
+    parser.add_option('--radius', dest='radius', type='int', default=2,
+                      help='Manhattan radius around the agent whose costs change [Default: %default]')
+    parser.add_option('--penalty', dest='penalty', type='int', default=10,
+                      help='Step cost of a penalised cell [Default: %default]')
+    parser.add_option('--seed', dest='seed', type='int', default=0,
+                      help='Random seed for the penalised cells [Default: %default]')
+    options, _ = parser.parse_args()
+    runBenchmark(options.layouts.split(','), options.radius, options.penalty, options.seed)
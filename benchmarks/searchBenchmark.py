@@ -0,0 +1,277 @@
+# searchBenchmark.py
+# ------------------
+# Runs every search algorithm in search.py on every problem class it applies
+# to, over each bundled layout that suits the problem (and the
+# EIGHT_PUZZLE_DATA puzzles for EightPuzzleSearchProblem).  Each run records
+# the states expanded, the path cost, the wall time and the peak resident set
+# size of a forked process that does nothing but that run; the time is the
+# fastest of a few repeats.
+#
+# Results can be saved as a baseline and later runs compared against it; any
+# metric that grows by more than the threshold is flagged as a regression and
+# the script exits with status 1.  Runs that exceed the expansion or time
+# budget are reported as 'limit' or 'timeout'; searches or problems that are
+# still unimplemented are reported as 'undefined'.
+#
+# > python benchmarks/searchBenchmark.py --save benchmarks/searchBaseline.json
+# > python benchmarks/searchBenchmark.py --baseline benchmarks/searchBaseline.json
+# > python benchmarks/searchBenchmark.py --algorithms bfs,astar --problems PositionSearchProblem --layouts mediumMaze,bigMaze
+
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import eightpuzzle
+import layout
+import pacman
+import search
+import searchAgents
+import util
+
+
+def _noGhosts(lay):
+    return lay.getNumGhosts() == 0
+
+def _suitsPosition(lay):
+    return _noGhosts(lay) and not lay.walls[1][1]
+
+def _suitsCorners(lay):
+    top, right = lay.height - 2, lay.width - 2
+    return _noGhosts(lay) and not [c for c in [(1, 1), (1, top), (right, 1), (right, top)] if lay.walls[c[0]][c[1]]]
+
+def _suitsFood(lay):
+    return _noGhosts(lay) and lay.food.count() > 0
+
+# Problem class name, the heuristic for informed searches, and whether a
+# layout suits the problem (None: the problem runs on the eight puzzles)
+PROBLEMS = [('PositionSearchProblem', searchAgents.manhattanHeuristic, _suitsPosition),
+            ('CornersProblem', searchAgents.cornersHeuristic, _suitsCorners),
+            ('FoodSearchProblem', searchAgents.foodHeuristic, _suitsFood),
+            ('AnyFoodSearchProblem', search.nullHeuristic, _suitsFood),
+            ('EightPuzzleSearchProblem', eightpuzzle.eightPuzzlePatternDatabaseHeuristic, None)]
+
+METRICS = ['expansions', 'cost', 'time', 'rss']
+TIME_FLOOR = 0.01 # Runs faster than this (seconds) are too noisy to flag on time
+
+class ExpansionLimitExceeded(Exception):
+    pass
+
+def isReversible(problem):
+    "True if the problem overrides the methods bidirectionalSearch needs"
+    for name in ['reverseExpand', 'getGoalStates']:
+        method = getattr(type(problem), name, None)
+        if method == None or method == getattr(search.SearchProblem, name):
+            return False
+    return True
+
+def isGrid(problem):
+    "True if the problem is a unit-cost walk on the walls, as jumpPointSearch needs"
+    return isinstance(problem, searchAgents.PositionSearchProblem)
+
+# search.py function, whether it takes a heuristic, and which problems it can
+# solve (None: all of them)
+ALGORITHMS = [('dfs', False, None), ('bfs', False, None), ('ucs', False, None),
+              ('astar', True, None), ('ida', True, None), ('rbfs', True, None),
+              ('bidi', True, isReversible), ('jps', False, isGrid), ('beam', True, None),
+              ('sma', True, None), ('ara', True, None)]
+
+# Extra keyword arguments for the searches that need them
+ALGORITHM_ARGUMENTS = {'ara': {'timeBudget': 0.5}} # Fixed, so ara runs are comparable
+
+def makeProblem(problemName, instance):
+    "Builds a problem on a layout name, or on an eight puzzle named eightPuzzle-<i>"
+    if problemName == 'EightPuzzleSearchProblem':
+        puzzleNumber = int(instance.split('-')[1])
+        return eightpuzzle.EightPuzzleSearchProblem(eightpuzzle.loadEightPuzzle(puzzleNumber))
+    state = pacman.GameState()
+    state.initialize(layout.getLayout(instance), 0)
+    if problemName == 'PositionSearchProblem':
+        return searchAgents.PositionSearchProblem(state, warn=False, visualize=False)
+    return getattr(searchAgents, problemName)(state)
+
+def countExpansions(problem, limit):
+    "Counts calls to the problem's expand methods, raising past the limit"
+    counter = [0]
+    for name in ['expand', 'reverseExpand']:
+        method = getattr(problem, name, None)
+        if method == None: continue
+        def limited(state, method=method):
+            counter[0] += 1
+            if counter[0] > limit: raise ExpansionLimitExceeded()
+            return method(state)
+        setattr(problem, name, limited)
+    return counter
+
+def runSearch(algorithm, informed, applies, problemName, heuristic, instance, maxExpansions, timeout):
+    "Runs one search in this process and returns its result record"
+    record = {'status': 'ok', 'expansions': None, 'cost': None, 'time': None, 'rss': None}
+    try:
+        problem = makeProblem(problemName, instance)
+        if applies != None and not applies(problem):
+            record['status'] = 'skipped'
+            return record
+        counter = countExpansions(problem, maxExpansions)
+        function = getattr(search, algorithm)
+        arguments = ALGORITHM_ARGUMENTS.get(algorithm, {})
+        if informed:
+            call = lambda: function(problem, heuristic, **arguments)
+        else:
+            call = lambda: function(problem, **arguments)
+        if informed: heuristic(problem.getStartState(), problem) # Load any tables it uses
+        start = time.perf_counter()
+        try:
+            actions = util.TimeoutFunction(call, timeout)()
+            record['time'] = time.perf_counter() - start
+            record['cost'] = problem.getCostOfActionSequence(actions)
+        finally:
+            record['expansions'] = counter[0]
+            if hasattr(problem, '_searchStats'): # Also counts searches that bypass expand
+                record['expansions'] = problem._searchStats.nodesExpanded
+    except ExpansionLimitExceeded:
+        record['status'] = 'limit'
+    except util.TimeoutFunctionException:
+        record['status'] = 'timeout'
+    except SystemExit:
+        record['status'] = 'undefined' # util.raiseNotDefined
+    except Exception as e:
+        record['status'] = 'error: %s' % e.__class__.__name__
+    record['rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    return record
+
+def _runInChild(connection, args):
+    sys.stdout = open(os.devnull, 'w')
+    connection.send(runSearch(*args))
+    connection.close()
+
+def runIsolated(args, timeout):
+    "Runs runSearch in a forked process, so the peak RSS belongs to this run alone"
+    context = multiprocessing.get_context('fork')
+    parent, child = context.Pipe(duplex=False)
+    process = context.Process(target=_runInChild, args=(child, args))
+    process.start()
+    child.close()
+    record = None
+    if parent.poll(timeout + 10):
+        try:
+            record = parent.recv()
+        except EOFError:
+            pass
+    if process.is_alive(): process.kill()
+    process.join()
+    if record == None:
+        record = {'status': 'crashed', 'expansions': None, 'cost': None, 'time': None, 'rss': None}
+    return record
+
+def runRepeated(args, timeout, repeats):
+    "Runs a search 'repeats' times, keeping the fastest time and the peak RSS"
+    record = runIsolated(args, timeout)
+    for i in range(repeats - 1):
+        if record['status'] != 'ok': break
+        again = runIsolated(args, timeout)
+        if again['status'] != 'ok': return again
+        record['time'] = min(record['time'], again['time'])
+        record['rss'] = max(record['rss'], again['rss'])
+    return record
+
+def listRuns(algorithms, problems, layoutNames):
+    "Yields (algorithm, informed, applies, problem, heuristic, instance) for every run"
+    allLayouts = sorted([name[:-4] for name in os.listdir('layouts') if name.endswith('.lay')])
+    for problemName, heuristic, suits in PROBLEMS:
+        if problems and problemName not in problems: continue
+        if suits == None:
+            instances = ['eightPuzzle-%d' % i for i in range(len(eightpuzzle.EIGHT_PUZZLE_DATA))]
+        else:
+            instances = [name for name in allLayouts if suits(layout.getLayout(name))]
+        if layoutNames: instances = [name for name in instances if name in layoutNames]
+        for instance in instances:
+            for algorithm, informed, applies in ALGORITHMS:
+                if algorithms and algorithm not in algorithms: continue
+                yield algorithm, informed, applies, problemName, heuristic, instance
+
+def findRegressions(record, base, threshold):
+    "Returns the names of the metrics of record that regressed against base"
+    if base == None: return []
+    if base['status'] == 'ok' and record['status'] != 'ok':
+        return ['status']
+    if record['status'] != 'ok' or base['status'] != 'ok':
+        return []
+    regressed = []
+    for metric in METRICS:
+        old, new = base[metric], record[metric]
+        if old == None or new == None: continue
+        if metric == 'time' and max(old, new) < TIME_FLOOR: continue
+        if new > old * (1 + threshold): regressed.append(metric)
+    return regressed
+
+def _format(value, pattern):
+    if value == None: return '-'
+    return pattern % value
+
+def runBenchmark(algorithms, problems, layoutNames, maxExpansions, timeout, repeats, baseline, threshold):
+    "Runs the benchmark, printing a row per run; returns (results, number of regressions)"
+    results = {}
+    regressions = 0
+    print('%-6s %-25s %-18s %-10s %10s %8s %9s %8s  %s' %
+          ('search', 'problem', 'layout', 'status', 'expanded', 'cost', 'seconds', 'rss MB', 'regressed'))
+    for run in listRuns(algorithms, problems, layoutNames):
+        algorithm, problemName, instance = run[0], run[3], run[5]
+        record = runRepeated(run + (maxExpansions, timeout), timeout, repeats)
+        if record['status'] == 'skipped': continue
+        key = '%s/%s/%s' % (algorithm, problemName, instance)
+        results[key] = record
+        regressed = findRegressions(record, baseline.get(key), threshold)
+        if regressed: regressions += 1
+        print('%-6s %-25s %-18s %-10s %10s %8s %9s %8s  %s' %
+              (algorithm, problemName, instance, record['status'], _format(record['expansions'], '%d'),
+               _format(record['cost'], '%g'), _format(record['time'], '%.4f'), _format(record['rss'], '%.1f'),
+               ','.join(regressed)))
+        sys.stdout.flush()
+    return results, regressions
+
+def _splitList(option):
+    if option == None: return None
+    return option.split(',')
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option('--algorithms', dest='algorithms', default=None,
+                      help='Comma-separated search.py functions to run, of ' + ','.join([a[0] for a in ALGORITHMS]) + ' [Default: all]')
+    parser.add_option('--problems', dest='problems', default=None,
+                      help='Comma-separated problem classes to run [Default: all]')
+    parser.add_option('--layouts', dest='layouts', default=None,
+                      help='Comma-separated layouts (or eightPuzzle-<i>) to run on [Default: all that apply]')
+    parser.add_option('--maxExpansions', dest='maxExpansions', type='int', default=50000,
+                      help='Expansions after which a run is stopped [Default: %default]')
+    parser.add_option('--timeout', dest='timeout', type='float', default=30,
+                      help='Seconds after which a run is stopped [Default: %default]')
+    parser.add_option('--repeats', dest='repeats', type='int', default=3,
+                      help='Times each search is run; the fastest time is kept [Default: %default]')
+    parser.add_option('--baseline', dest='baseline', default=None,
+                      help='Baseline JSON file to compare against')
+    parser.add_option('--threshold', dest='threshold', type='float', default=0.1,
+                      help='Relative growth of a metric over the baseline that counts as a regression [Default: %default]')
+    parser.add_option('--save', dest='save', default=None,
+                      help='Write the results to this JSON file, for use as a baseline')
+    options, _ = parser.parse_args()
+
+    baseline = {}
+    if options.baseline != None:
+        handle = open(options.baseline)
+        try: baseline = json.load(handle)
+        finally: handle.close()
+    results, regressions = runBenchmark(_splitList(options.algorithms), _splitList(options.problems),
+                                        _splitList(options.layouts), options.maxExpansions, options.timeout, options.repeats,
+                                        baseline, options.threshold)
+    if options.save != None:
+        handle = open(options.save, 'w')
+        try: json.dump(results, handle, indent=1, sort_keys=True)
+        finally: handle.close()
+    if options.baseline != None:
+        print('%d of %d runs regressed by more than %d%%' % (regressions, len(results), options.threshold * 100))
+        if regressions: sys.exit(1)
@@ -0,0 +1,62 @@
+# timeoutBenchmark.py
+# -------------------
+# Measures the per-call overhead of util.TimeoutFunction, the way Game.run
+# wraps every getAction, against the SIGALRM version it replaced, with and
+# without an enclosing timeout like the one Grades.grade puts around a
+# question.
+#
+# > python benchmarks/timeoutBenchmark.py
+# > python benchmarks/timeoutBenchmark.py --calls 1000000
+
+import os
+import signal
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import util
+
+class LegacyTimeoutFunction:
+    "The original util.TimeoutFunction, which installs a handler on every call."
+    def __init__(self, function, timeout):
+        self.timeout = timeout
+        self.function = function
+
+    def handle_timeout(self, signum, frame):
+        raise util.TimeoutFunctionException()
+
+    def __call__(self, *args, **keyArgs):
+        old = signal.signal(signal.SIGALRM, self.handle_timeout)
+        signal.alarm(self.timeout)
+        try:
+            result = self.function(*args, **keyArgs)
+        finally:
+            signal.signal(signal.SIGALRM, old)
+        signal.alarm(0)
+        return result
+
+def getAction(state):
+    return state
+
+def microsecondsPerCall(timeoutClass, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        timeoutClass(getAction, 1)(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+def runBenchmark(calls):
+    print('%-8s %-10s %10s' % ('timeout', 'enclosed', 'us/call'))
+    for name, timeoutClass in [('legacy', LegacyTimeoutFunction), ('stack', util.TimeoutFunction)]:
+        print('%-8s %-10s %10.2f' % (name, 'no', microsecondsPerCall(timeoutClass, calls)))
+        # The legacy version disables the enclosing alarm, so time it only once.
+        if timeoutClass == util.TimeoutFunction:
+            enclosed = util.TimeoutFunction(microsecondsPerCall, 1800)(timeoutClass, calls)
+            print('%-8s %-10s %10.2f' % (name, 'yes', enclosed))
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option('--calls', dest='calls', type='int', default=200000,
+                      help='Number of timed calls [Default: %default]')
+    options, _ = parser.parse_args()
+    runBenchmark(options.calls)
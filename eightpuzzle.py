@@ -14,9 +14,17 @@
 
 import search
 import random
+import npuzzle
 
 # Module Classes
 
+_PUZZLE = npuzzle.NPuzzle(3)
+_BLANK_SHIFT = _PUZZLE.blankShift
+_TILE_MASK = _PUZZLE.tileMask
+# For each blank cell, the legal moves and the cell each one moves the blank to.
+_LEGAL_MOVES = [[move for move, cell in moves] for moves in _PUZZLE.moves]
+_MOVE_TARGETS = [dict(moves) for moves in _PUZZLE.moves]
+
 class EightPuzzleState:
     """
     The Eight Puzzle is described in the course textbook on
@@ -27,6 +35,8 @@ class EightPuzzleState:
     the EightPuzzleSearchProblem class.
     """
 
+    __slots__ = ['packed']
+
     def __init__( self, numbers ):
         """
           Constructs a new eight puzzle from an ordering of numbers.
@@ -46,18 +56,28 @@ class EightPuzzleState:
             | 6 | 7 | 8 |
             ------------
 
-        The configuration of the puzzle is stored in a 2-dimensional
-        list (a list of lists) 'cells'.
+        The configuration of the puzzle is packed into the int 'packed' in
+        the npuzzle.NPuzzle encoding: 4 bits per tile, row by row, with the
+        blank's index above them.  'cells' and 'blankLocation' are derived
+        from it.
         """
-        self.cells = []
-        numbers = numbers[:] # Make a copy so as not to cause side-effects.
-        numbers.reverse()
-        for row in range( 3 ):
-            self.cells.append( [] )
-            for col in range( 3 ):
-                self.cells[row].append( numbers.pop() )
-                if self.cells[row][col] == 0:
-                    self.blankLocation = row, col
+        self.packed = _PUZZLE.pack(list(numbers))
+
+    def fromPacked(packed):
+        "Returns the EightPuzzleState for an int in the npuzzle.NPuzzle encoding"
+        puzzle = EightPuzzleState.__new__(EightPuzzleState)
+        puzzle.packed = packed
+        return puzzle
+    fromPacked = staticmethod(fromPacked)
+
+    def _getCells(self):
+        numbers = _PUZZLE.unpack(self.packed)
+        return [numbers[0:3], numbers[3:6], numbers[6:9]]
+    cells = property(_getCells, doc="The configuration as a 3x3 list of lists (a copy)")
+
+    def _getBlankLocation(self):
+        return divmod(self.packed >> _BLANK_SHIFT, 3)
+    blankLocation = property(_getBlankLocation, doc="The (row, col) of the blank")
 
     def isGoal( self ):
         """
@@ -77,13 +97,7 @@ class EightPuzzleState:
         >>> EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).isGoal()
         False
         """
-        current = 0
-        for row in range( 3 ):
-            for col in range( 3 ):
-                if current != self.cells[row][col]:
-                    return False
-                current += 1
-        return True
+        return self.packed == _PUZZLE.goal
 
     def legalMoves( self ):
         """
@@ -95,17 +109,7 @@ class EightPuzzleState:
         >>> EightPuzzleState([0, 1, 2, 3, 4, 5, 6, 7, 8]).legalMoves()
         ['down', 'right']
         """
-        moves = []
-        row, col = self.blankLocation
-        if(row != 0):
-            moves.append('up')
-        if(row != 2):
-            moves.append('down')
-        if(col != 0):
-            moves.append('left')
-        if(col != 2):
-            moves.append('right')
-        return moves
+        return list(_LEGAL_MOVES[self.packed >> _BLANK_SHIFT])
 
     def result(self, move):
         """
@@ -113,37 +117,20 @@ class EightPuzzleState:
         updated based on the provided move.
 
         The move should be a string drawn from a list returned by legalMoves.
-        Illegal moves will raise an exception, which may be an array bounds
-        exception.
+        Illegal moves will raise an exception.
 
         NOTE: This function *does not* change the current object.  Instead,
         it returns a new object.
         """
-        row, col = self.blankLocation
-        if(move == 'up'):
-            newrow = row - 1
-            newcol = col
-        elif(move == 'down'):
-            newrow = row + 1
-            newcol = col
-        elif(move == 'left'):
-            newrow = row
-            newcol = col - 1
-        elif(move == 'right'):
-            newrow = row
-            newcol = col + 1
-        else:
-            raise "Illegal Move"
-
-        # Create a copy of the current eightPuzzle
-        newPuzzle = EightPuzzleState([0, 0, 0, 0, 0, 0, 0, 0, 0])
-        newPuzzle.cells = [values[:] for values in self.cells]
-        # And update it to reflect the move
-        newPuzzle.cells[row][col] = self.cells[newrow][newcol]
-        newPuzzle.cells[newrow][newcol] = self.cells[row][col]
-        newPuzzle.blankLocation = newrow, newcol
-
-        return newPuzzle
+        packed = self.packed
+        blank = packed >> _BLANK_SHIFT
+        cell = _MOVE_TARGETS[blank].get(move)
+        if cell == None:
+            raise Exception('Illegal move: ' + str(move))
+        # The blank's nibble is 0, so xor moves the tile and clears its old cell.
+        tile = (packed >> (4 * cell)) & 15
+        tiles = (packed & _TILE_MASK) ^ (tile << (4 * cell)) ^ (tile << (4 * blank))
+        return EightPuzzleState.fromPacked(tiles | (cell << _BLANK_SHIFT))
 
     # Utilities for comparison and display
     def __eq__(self, other):
@@ -155,13 +142,13 @@ class EightPuzzleState:
               EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).result('left')
           True
         """
-        for row in range( 3 ):
-            if self.cells[row] != other.cells[row]:
-                return False
-        return True
+        return isinstance(other, EightPuzzleState) and self.packed == other.packed
+
+    def __ne__(self, other):
+        return not self == other
 
     def __hash__(self):
-        return hash(str(self.cells))
+        return hash(self.packed)
 
     def __getAsciiString(self):
         """
@@ -194,9 +181,10 @@ class EightPuzzleSearchProblem(search.SearchProblem):
     def __init__(self,puzzle):
         "Creates a new EightPuzzleSearchProblem which stores search information."
         self.puzzle = puzzle
+        self.heuristicInfo = {}
 
     def getStartState(self):
-        return puzzle
+        return self.puzzle
 
     def isGoalState(self,state):
         return state.isGoal()
@@ -235,6 +223,17 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         """
         return len(actions)
 
+def eightPuzzlePatternDatabaseHeuristic(state, problem):
+    """
+      The additive pattern database heuristic of npuzzle for an
+      EightPuzzleSearchProblem.  It is admissible and consistent.
+    """
+    database = problem.heuristicInfo.get('patternDatabase')
+    if database == None:
+        database = npuzzle.loadAdditivePatternDatabase(3)
+        problem.heuristicInfo['patternDatabase'] = database
+    return database.getValue(state.packed)
+
 EIGHT_PUZZLE_DATA = [[1, 0, 2, 3, 4, 5, 6, 7, 8],
                      [1, 7, 8, 2, 3, 4, 5, 6, 0],
                      [4, 3, 2, 7, 0, 5, 1, 6, 8],
@@ -280,6 +280,161 @@ def reconstituteGrid(bitRep):
     width, height = bitRep[:2]
     return Grid(width, height, bitRepresentation= bitRep[2:])
 
+if hasattr(int, 'bit_count'):
+    _popcount = int.bit_count
+else:
+    def _popcount(n):
+        return bin(n).count('1')
+
+class BitGrid(Grid):
+    """
+    A boolean Grid backed by a single arbitrary-precision int.  Cell (x,y) is
+    bit x * height + y, the same order Grid.__hash__ walks the cells in, so a
+    BitGrid hashes and compares equal to a Grid holding the same values.
+
+    Data is still accessed via grid[x][y]; grid[x] returns a small column
+    proxy that reads and writes bits of the shared int.  Because ints are
+    immutable, copy() only shares the int and a write replaces it, which makes
+    copies O(1) and copy-on-write.  The hash is cached until the next write
+    and count() is a popcount.
+    """
+    def __init__(self, width, height, initialValue=False, bitRepresentation=None):
+        if initialValue not in [False, True]: raise Exception('Grids can only contain booleans')
+        self.CELLS_PER_INT = 30
+
+        self.width = width
+        self.height = height
+        self.bits = (1 << (width * height)) - 1 if initialValue else 0
+        self._hash = None
+        if bitRepresentation:
+            self._unpackBits(bitRepresentation)
+
+    def fromGrid(grid):
+        "Builds a BitGrid holding the same values as any Grid"
+        if isinstance(grid, BitGrid):
+            return grid.copy()
+        g = BitGrid(grid.width, grid.height)
+        bits = 0
+        shift = 0
+        for column in grid.data:
+            for cell in column:
+                if cell:
+                    bits |= 1 << shift
+                shift += 1
+        g.bits = bits
+        return g
+    fromGrid = staticmethod(fromGrid)
+
+    def fromBits(width, height, bits):
+        "Wraps an int bitmask laid out as described in the class docstring"
+        g = BitGrid(width, height)
+        g.bits = bits
+        return g
+    fromBits = staticmethod(fromBits)
+
+    def __getitem__(self, x):
+        if x < 0: x += self.width
+        if not 0 <= x < self.width: raise IndexError('grid index out of range')
+        return _BitColumn(self, x)
+
+    def __setitem__(self, x, column):
+        if x < 0: x += self.width
+        if not 0 <= x < self.width: raise IndexError('grid index out of range')
+        base = x * self.height
+        bits = self.bits & ~(((1 << self.height) - 1) << base)
+        for y, cell in enumerate(column):
+            if cell:
+                bits |= 1 << (base + y)
+        self.bits = bits
+        self._hash = None
+
+    def _get(self, x, y):
+        return (self.bits >> (x * self.height + y)) & 1 == 1
+
+    def _set(self, x, y, value):
+        mask = 1 << (x * self.height + y)
+        if value:
+            self.bits |= mask
+        else:
+            self.bits &= ~mask
+        self._hash = None
+
+    def getData(self):
+        return [[self._get(x, y) for y in range(self.height)] for x in range(self.width)]
+    # Lets Grid.__eq__ compare a Grid against a BitGrid
+    data = property(getData)
+
+    def __str__(self):
+        out = [[str(self._get(x, y))[0] for x in range(self.width)] for y in range(self.height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+    def __eq__(self, other):
+        if other == None: return False
+        if isinstance(other, BitGrid):
+            return self.bits == other.bits and self.height == other.height and self.width == other.width
+        return self.data == other.data
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(self.bits)
+        return self._hash
+
+    def copy(self):
+        g = BitGrid(self.width, self.height)
+        g.bits = self.bits
+        g._hash = self._hash
+        return g
+
+    def deepCopy(self):
+        return self.copy()
+
+    def shallowCopy(self):
+        return self.copy()
+
+    def count(self, item =True ):
+        ones = _popcount(self.bits)
+        if item: return ones
+        return self.width * self.height - ones
+
+    def asList(self, key = True):
+        bits = self.bits
+        if not key:
+            bits = ~bits & ((1 << (self.width * self.height)) - 1)
+        list = []
+        height = self.height
+        while bits:
+            low = bits & -bits
+            index = low.bit_length() - 1
+            list.append((index // height, index % height))
+            bits ^= low
+        return list
+
+class _BitColumn:
+    "A view of column x of a BitGrid, supporting column[y] reads and writes."
+    __slots__ = ('grid', 'x')
+
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.x = x
+
+    def __getitem__(self, y):
+        if y < 0: y += self.grid.height
+        if not 0 <= y < self.grid.height: raise IndexError('grid index out of range')
+        return self.grid._get(self.x, y)
+
+    def __setitem__(self, y, value):
+        if y < 0: y += self.grid.height
+        if not 0 <= y < self.grid.height: raise IndexError('grid index out of range')
+        self.grid._set(self.x, y, value)
+
+    def __len__(self):
+        return self.grid.height
+
+    def __iter__(self):
+        for y in range(self.grid.height):
+            yield self.grid._get(self.x, y)
+
 ####################################
 # Parts you shouldn't have to read #
 ####################################
@@ -370,20 +525,38 @@ class Actions:
 
 class GameStateData:
     """
-
+    The food, capsules, agent states, layout and score of a game state.
+
+    A packet made from a predecessor shares the predecessor's food grid,
+    capsule list, layout and AgentStates, and copies one only when it first
+    changes it.  Rules must therefore go through getAgentStateForUpdate,
+    eatFood, addFood and eatCapsule instead of mutating shared objects in
+    place.  eatFood and addFood also keep the number of remaining food
+    pellets, so getNumFood does not scan the grid.
+
+    Set checkFoodCount to verify that count against the grid on every
+    getNumFood, and useFoodBits to keep the food in a BitGrid, which makes
+    copying and counting it (in FoodSearchProblem too) nearly free.
     """
+    checkFoodCount = False
+    useFoodBits = False
+
     def __init__( self, prevState = None ):
         """
-        Generates a new data packet by copying information from its predecessor.
+        Generates a new data packet sharing the information of its predecessor.
         """
         if prevState != None:
-            self.food = prevState.food.shallowCopy()
-            self.capsules = prevState.capsules[:]
-            self.agentStates = self.copyAgentStates( prevState.agentStates )
+            self.food = prevState.food
+            self._numFood = prevState._numFood
+            self.capsules = prevState.capsules
+            self.agentStates = prevState.agentStates[:]
             self.layout = prevState.layout
             self._eaten = prevState._eaten
             self.score = prevState.score
 
+        self._ownsFood = False
+        self._ownsCapsules = False
+        self._ownedAgents = 0 # Bit i is set once agentStates[i] is this packet's own copy
         self._foodEaten = None
         self._foodAdded = None
         self._capsuleEaten = None
@@ -393,9 +566,17 @@ class GameStateData:
         self.scoreChange = 0
 
     def deepCopy( self ):
+        """
+        Returns a packet whose food and agent states can be changed freely.
+        The layout never changes during a game and stays shared.
+        """
         state = GameStateData( self )
         state.food = self.food.deepCopy()
-        state.layout = self.layout.deepCopy()
+        state.capsules = self.capsules[:]
+        state.agentStates = self.copyAgentStates( self.agentStates )
+        state._ownsFood = True
+        state._ownsCapsules = True
+        state._ownedAgents = (1 << len(state.agentStates)) - 1
         state._agentMoved = self._agentMoved
         state._foodEaten = self._foodEaten
         state._foodAdded = self._foodAdded
@@ -408,6 +589,47 @@ class GameStateData:
             copiedStates.append( agentState.copy() )
         return copiedStates
 
+    def getAgentStateForUpdate( self, index ):
+        """
+        Returns agentStates[index], first replacing it with a copy if it is
+        still shared with the predecessor.
+        """
+        if not (self._ownedAgents >> index) & 1:
+            self.agentStates[index] = self.agentStates[index].copy()
+            self._ownedAgents |= 1 << index
+        return self.agentStates[index]
+
+    def eatFood( self, x, y ):
+        "Removes the food at (x, y), copying the food grid if it is shared"
+        if not self.food[x][y]: return
+        if not self._ownsFood:
+            self.food = self.food.copy()
+            self._ownsFood = True
+        self.food[x][y] = False
+        self._numFood -= 1
+
+    def addFood( self, x, y ):
+        "Puts food at (x, y), copying the food grid if it is shared"
+        if self.food[x][y]: return
+        if not self._ownsFood:
+            self.food = self.food.copy()
+            self._ownsFood = True
+        self.food[x][y] = True
+        self._numFood += 1
+
+    def getNumFood( self ):
+        if self.checkFoodCount:
+            assert self._numFood == self.food.count(), (
+                "Cached food count %d does not match the grid (%d)" % (self._numFood, self.food.count()))
+        return self._numFood
+
+    def eatCapsule( self, position ):
+        "Removes a capsule, copying the capsule list if it is shared"
+        if not self._ownsCapsules:
+            self.capsules = self.capsules[:]
+            self._ownsCapsules = True
+        self.capsules.remove( position )
+
     def __eq__( self, other ):
         """
         Allows two states to be compared.
@@ -488,9 +710,15 @@ class GameStateData:
         """
         Creates an initial game state from a layout array (see layout.py).
         """
-        self.food = layout.food.copy()
+        if self.useFoodBits:
+            self.food = BitGrid.fromGrid(layout.food)
+        else:
+            self.food = layout.food.copy()
+        self._ownsFood = True
+        self._numFood = self.food.count()
         #self.capsules = []
         self.capsules = layout.capsules[:]
+        self._ownsCapsules = True
         self.layout = layout
         self.score = 0
         self.scoreChange = 0
@@ -502,6 +730,7 @@ class GameStateData:
                 if numGhosts == numGhostAgents: continue # Max ghosts reached already
                 else: numGhosts += 1
             self.agentStates.append( AgentState( Configuration( pos, Directions.STOP), isPacman) )
+        self._ownedAgents = (1 << len(self.agentStates)) - 1
         self._eaten = [False for a in self.agentStates]
 
 try:
@@ -587,7 +816,7 @@ class Game:
                 self.mute(i)
                 if self.catchExceptions:
                     try:
-                        timed_func = TimeoutFunction(agent.registerInitialState, int(self.rules.getMaxStartupTime(i)))
+                        timed_func = TimeoutFunction(agent.registerInitialState, self.rules.getMaxStartupTime(i))
                         try:
                             start_time = time.time()
                             timed_func(self.state.deepCopy())
@@ -621,7 +850,7 @@ class Game:
                 self.mute(agentIndex)
                 if self.catchExceptions:
                     try:
-                        timed_func = TimeoutFunction(agent.observationFunction, int(self.rules.getMoveTimeout(agentIndex)))
+                        timed_func = TimeoutFunction(agent.observationFunction, self.rules.getMoveTimeout(agentIndex))
                         try:
                             start_time = time.time()
                             observation = timed_func(self.state.deepCopy())
@@ -644,7 +873,7 @@ class Game:
             self.mute(agentIndex)
             if self.catchExceptions:
                 try:
-                    timed_func = TimeoutFunction(agent.getAction, int(self.rules.getMoveTimeout(agentIndex)) - int(move_time))
+                    timed_func = TimeoutFunction(agent.getAction, self.rules.getMoveTimeout(agentIndex) - move_time)
                     try:
                         start_time = time.time()
                         if skip_action:
@@ -14,10 +14,13 @@
 
 "Common code for autograders"
 
-import cgi
+import html
 import time
 import sys
+import io
 import json
+import multiprocessing
+import multiprocessing.connection
 import traceback
 import pdb
 from collections import defaultdict
@@ -51,10 +54,12 @@ class Grades:
   def addPrereq(self, question, prereq):
     self.prereqs[question].add(prereq)
 
-  def grade(self, gradingModule, exceptionMap = {}, bonusPic = False):
+  def grade(self, gradingModule, exceptionMap = {}, bonusPic = False, questionTimeout = 1800):
     """
     Grades each question
       gradingModule: the module with all the grading functions (pass in with sys.modules[__name__])
+      questionTimeout: seconds allowed per question, or None when the test
+        cases enforce their own timeouts (see ParallelTestRunner)
     """
 
     completedQuestions = set([])
@@ -75,7 +80,10 @@ class Grades:
 
       if self.mute: util.mutePrint()
       try:
-        util.TimeoutFunction(getattr(gradingModule, q),1800)(self) # Call the question's function
+        if questionTimeout == None:
+          getattr(gradingModule, q)(self)
+        else:
+          util.TimeoutFunction(getattr(gradingModule, q),questionTimeout)(self) # Call the question's function
         #TimeoutFunction(getattr(gradingModule, q),1200)(self) # Call the question's function
       except Exception as inst:
         self.addExceptionMessage(q, inst, traceback)
@@ -148,7 +156,9 @@ to follow your instructor's guidelines to receive credit on your project.
     """
     self.fail('FAIL: Exception raised: %s' % inst)
     self.addMessage('')
-    for line in traceback.format_exc().split('\n'):
+    # Exceptions replayed from a ParallelTestRunner carry the worker's traceback.
+    tracebackText = getattr(inst, 'remoteTraceback', None) or traceback.format_exc()
+    for line in tracebackText.split('\n'):
         self.addMessage(line)
 
   def addErrorHints(self, exceptionMap, errorInstance, questionNum):
@@ -291,7 +301,7 @@ to follow your instructor's guidelines to receive credit on your project.
         if self.mute: util.unmutePrint()
         print('*** ' + message)
         if self.mute: util.mutePrint()
-        message = cgi.escape(message)
+        message = html.escape(message, quote=False)
     self.messages[self.currentQuestion].append(message)
 
   def addMessageToEmail(self, message):
@@ -305,6 +315,146 @@ to follow your instructor's guidelines to receive credit on your project.
 
 
 
+class RecordingGrades:
+  """
+  Stands in for Grades in a test case run by a ParallelTestRunner worker.
+  Records the grading calls the test makes, and anything it prints between
+  them, so they can be replayed on the real Grades in the parent.
+  """
+  def __init__(self, output):
+    self.output = output
+    self.events = []
+
+  def flushOutput(self):
+    text = self.output.getvalue()
+    if text:
+      self.events.append(('print', text))
+      self.output.seek(0)
+      self.output.truncate()
+
+  def record(self, name, args):
+    self.flushOutput()
+    self.events.append((name, args))
+
+  def fail(self, *args): self.record('fail', args)
+  def assignZeroCredit(self, *args): self.record('assignZeroCredit', args)
+  def addPoints(self, *args): self.record('addPoints', args)
+  def deductPoints(self, *args): self.record('deductPoints', args)
+  def assignFullCredit(self, *args): self.record('assignFullCredit', args)
+  def addMessage(self, *args): self.record('addMessage', args)
+  def addMessageToEmail(self, *args): self.record('addMessageToEmail', args)
+
+def _runTestInWorker(thunk, connection):
+  output = io.StringIO()
+  sys.stdout = output
+  grades = RecordingGrades(output)
+  try:
+    outcome = ('return', thunk(grades), None)
+  except BaseException as inst:
+    outcome = ('raise', inst, traceback.format_exc())
+  grades.flushOutput()
+  try:
+    connection.send((grades.events, outcome))
+  except Exception:
+    # The exception could not be pickled; send its message instead.
+    connection.send((grades.events, ('raise', Exception(str(outcome[1])), outcome[2])))
+  connection.close()
+
+class ParallelTestRunner:
+  """
+  Runs test case thunks in forked worker processes, at most 'jobs' at a
+  time, each killed after 'timeout' seconds.
+
+  A question's test cases start when startQuestion is called, or when
+  Grades first runs one of them, so a question with unmet prerequisites
+  never runs.  The thunks returned by addTestCase wait for their test and
+  replay its grading calls and output on the real Grades in the original
+  order, so points, messages and the printed transcript match a serial run.
+  """
+  def __init__(self, jobs, timeout=1800):
+    self.jobs = jobs
+    self.timeout = timeout
+    self.context = multiprocessing.get_context('fork')
+    self.questions = {}
+    self.started = set()
+    self.pending = []
+    self.running = {}
+    self.results = {}
+
+  def isSupported():
+    "Workers inherit the loaded student code, so fork is required"
+    return 'fork' in multiprocessing.get_all_start_methods()
+  isSupported = staticmethod(isSupported)
+
+  def addTestCase(self, question, thunk):
+    "Registers a test case thunk and returns the thunk that replays it"
+    tests = self.questions.setdefault(question, [])
+    key = (question, len(tests))
+    tests.append((key, thunk))
+    return lambda grades: self.replay(key, grades)
+
+  def startQuestion(self, question):
+    if question in self.started: return
+    self.started.add(question)
+    self.pending.extend(self.questions.get(question, []))
+
+  def replay(self, key, grades):
+    self.startQuestion(key[0])
+    while key not in self.results:
+      self.startWorkers()
+      self.waitForWorkers()
+    events, outcome = self.results.pop(key)
+    for name, args in events:
+      if name == 'print': sys.stdout.write(args)
+      else: getattr(grades, name)(*args)
+    kind, value, remoteTraceback = outcome
+    if kind == 'raise':
+      if remoteTraceback != None:
+        try: value.remoteTraceback = remoteTraceback
+        except AttributeError: pass
+      raise value
+    return value
+
+  def startWorkers(self):
+    while self.pending and len(self.running) < self.jobs:
+      key, thunk = self.pending.pop(0)
+      receiver, sender = self.context.Pipe(False)
+      process = self.context.Process(target=_runTestInWorker, args=(thunk, sender))
+      process.start()
+      sender.close()
+      self.running[receiver] = (key, process, time.time() + self.timeout)
+
+  def waitForWorkers(self):
+    now = time.time()
+    nextDeadline = min([deadline for key, process, deadline in self.running.values()])
+    ready = multiprocessing.connection.wait(list(self.running.keys()), max(0, nextDeadline - now))
+    for receiver in ready:
+      key, process, deadline = self.running.pop(receiver)
+      try: result = receiver.recv()
+      except EOFError: result = None
+      receiver.close()
+      process.join()
+      if result == None:
+        result = ([], ('raise', Exception('Test process exited with code %s' % process.exitcode), None))
+      self.results[key] = result
+    now = time.time()
+    for receiver, (key, process, deadline) in list(self.running.items()):
+      if deadline <= now:
+        del self.running[receiver]
+        process.terminate()
+        process.join()
+        receiver.close()
+        self.results[key] = ([], ('raise', util.TimeoutFunctionException(), None))
+
+  def close(self):
+    "Kills any test cases still running"
+    for receiver, (key, process, deadline) in self.running.items():
+      process.terminate()
+      process.join()
+      receiver.close()
+    self.running = {}
+    self.pending = []
+
 class Counter(dict):
   """
   Dict with default 0
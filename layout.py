@@ -13,54 +13,76 @@
 
 
 from util import manhattanDistance
-from game import Grid
+from game import Actions, Directions, Grid
+from array import array
+import util
+import hashlib
+import marshal
 import os
 import random
-from functools import reduce
 
 VISIBILITY_MATRIX_CACHE = {}
 
+class CompiledLayout:
+    """
+    The parsed content of a layout, shared by every Layout made from the same
+    text and never modified.  Walls and food are int bitsets in which bit
+    x * height + y is set for cell (x, y), as in game.BitGrid; capsules and
+    agentPositions are tuples.
+    """
+    __slots__ = ['width', 'height', 'wallBits', 'foodBits', 'capsules', 'agentPositions', 'numGhosts']
+
+    def __init__(self, width, height, wallBits, foodBits, capsules, agentPositions, numGhosts):
+        self.width = width
+        self.height = height
+        self.wallBits = wallBits
+        self.foodBits = foodBits
+        self.capsules = tuple(capsules)
+        self.agentPositions = tuple(agentPositions)
+        self.numGhosts = numGhosts
+
+    def toTuple(self):
+        return (self.width, self.height, self.wallBits, self.foodBits,
+                self.capsules, self.agentPositions, self.numGhosts)
+
+    def makeGrid(self, bits):
+        "Returns a Grid with the cells set in 'bits'"
+        height = self.height
+        cells = bin(bits)[:1:-1].ljust(self.width * height, '0') # cells[i] is bit i
+        grid = Grid(0, height) # Filled in below, without a default fill first
+        grid.width = self.width
+        grid.data = [list(map('1'.__eq__, cells[x * height:(x + 1) * height])) for x in range(self.width)]
+        return grid
+
 class Layout:
     """
     A Layout manages the static information about the game board.
     """
 
-    def __init__(self, layoutText):
-        self.width = len(layoutText[0])
-        self.height= len(layoutText)
-        self.walls = Grid(self.width, self.height, False)
-        self.food = Grid(self.width, self.height, False)
-        self.capsules = []
-        self.agentPositions = []
-        self.numGhosts = 0
-        self.processLayoutText(layoutText)
+    def __init__(self, layoutText, compiled = None):
+        if compiled == None:
+            compiled = compileLayout(layoutText)
+        self.compiled = compiled
+        self.width = compiled.width
+        self.height = compiled.height
+        self.walls = compiled.makeGrid(compiled.wallBits)
+        self.food = compiled.makeGrid(compiled.foodBits)
+        self.capsules = list(compiled.capsules)
+        self.agentPositions = list(compiled.agentPositions)
+        self.numGhosts = compiled.numGhosts
         self.layoutText = layoutText
-        self.totalFood = len(self.food.asList())
-        # self.initializeVisibilityMatrix()
+        self.totalFood = self.food.count()
+        self.visibility = None # Set on first use by initializeVisibilityMatrix
 
     def getNumGhosts(self):
         return self.numGhosts
 
     def initializeVisibilityMatrix(self):
-        global VISIBILITY_MATRIX_CACHE
-        if reduce(str.__add__, self.layoutText) not in VISIBILITY_MATRIX_CACHE:
-            from game import Directions
-            vecs = [(-0.5,0), (0.5,0),(0,-0.5),(0,0.5)]
-            dirs = [Directions.NORTH, Directions.SOUTH, Directions.WEST, Directions.EAST]
-            vis = Grid(self.width, self.height, {Directions.NORTH:set(), Directions.SOUTH:set(), Directions.EAST:set(), Directions.WEST:set(), Directions.STOP:set()})
-            for x in range(self.width):
-                for y in range(self.height):
-                    if self.walls[x][y] == False:
-                        for vec, direction in zip(vecs, dirs):
-                            dx, dy = vec
-                            nextx, nexty = x + dx, y + dy
-                            while (nextx + nexty) != int(nextx) + int(nexty) or not self.walls[int(nextx)][int(nexty)] :
-                                vis[x][y][direction].add((nextx, nexty))
-                                nextx, nexty = x + dx, y + dy
-            self.visibility = vis
-            VISIBILITY_MATRIX_CACHE[reduce(str.__add__, self.layoutText)] = vis
-        else:
-            self.visibility = VISIBILITY_MATRIX_CACHE[reduce(str.__add__, self.layoutText)]
+        """
+        Attaches the VisibilityIndex shared by every layout with these walls.
+        Rays are only traced when isVisibleFrom first needs them.
+        """
+        self.visibility = VisibilityIndex.forLayout(self)
 
     def isWall(self, pos):
         x, col = pos
@@ -84,14 +106,15 @@ class Layout:
         return pos
 
     def isVisibleFrom(self, ghostPos, pacPos, pacDirection):
-        row, col = [int(x) for x in pacPos]
-        return ghostPos in self.visibility[row][col][pacDirection]
+        if self.visibility == None: self.initializeVisibilityMatrix()
+        return self.visibility.isVisibleFrom(ghostPos, pacPos, pacDirection)
 
     def __str__(self):
         return "\n".join(self.layoutText)
 
     def deepCopy(self):
-        return Layout(self.layoutText[:])
+        # The compiled form is shared, so this does not parse the text again.
+        return Layout(self.layoutText[:], self.compiled)
 
     def processLayoutText(self, layoutText):
         """
@@ -129,22 +152,170 @@ class Layout:
         elif layoutChar in  ['1', '2', '3', '4']:
             self.agentPositions.append( (int(layoutChar), (x,y)))
             self.numGhosts += 1
+
+# The compiled layouts of this process, by layout text and by file hash
+_COMPILED_TEXTS = {}
+_COMPILED_FILES = {}
+LAYOUT_CACHE_VERSION = 1
+
+def compileLayout(layoutText):
+    """
+    Parses layout text into a CompiledLayout, once per distinct text in
+    this process.
+    """
+    key = tuple(layoutText)
+    compiled = _COMPILED_TEXTS.get(key)
+    if compiled == None:
+        parsed = Layout.__new__(Layout)
+        parsed.width = len(layoutText[0])
+        parsed.height = len(layoutText)
+        parsed.walls = Grid(parsed.width, parsed.height, False)
+        parsed.food = Grid(parsed.width, parsed.height, False)
+        parsed.capsules = []
+        parsed.agentPositions = []
+        parsed.numGhosts = 0
+        parsed.processLayoutText(layoutText)
+        compiled = CompiledLayout(parsed.width, parsed.height, _gridBits(parsed.walls), _gridBits(parsed.food),
+                                  parsed.capsules, parsed.agentPositions, parsed.numGhosts)
+        _COMPILED_TEXTS[key] = compiled
+    return compiled
+
+def _gridBits(grid):
+    bits = 0
+    for x in range(grid.width):
+        for y in range(grid.height):
+            if grid[x][y]: bits |= 1 << (x * grid.height + y)
+    return bits
+
+class VisibilityIndex:
+    """
+    Line of sight on a layout: from a cell facing a direction, Pacman sees
+    along the row or column up to the first wall, including the half-cell
+    positions that scared ghosts can occupy.  Facing STOP sees nothing.
+
+    Each ray is stored as the number of open cells before the wall, in an
+    array with one entry per cell and direction.  Rays are traced lazily,
+    and tracing one also fills in the rays of the cells it passes.
+    """
+    UNKNOWN = 0xFFFF
+    DIRECTIONS = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]
+
+    def __init__(self, walls):
+        self.walls = walls
+        self.width = walls.width
+        self.height = walls.height
+        self.rays = array('H', [self.UNKNOWN]) * (self.width * self.height * 4)
+
+    def forLayout(layout):
+        "Returns the index for a layout's walls, shared by identical walls"
+        compiled = layout.compiled
+        key = (compiled.width, compiled.height, compiled.wallBits)
+        index = VISIBILITY_MATRIX_CACHE.get(key)
+        if index == None:
+            index = VisibilityIndex(layout.walls)
+            VISIBILITY_MATRIX_CACHE[key] = index
+        return index
+    forLayout = staticmethod(forLayout)
+
+    def getRayLength(self, x, y, direction):
+        "The number of open cells between (x, y) and the first wall in a direction"
+        d = self.DIRECTIONS.index(direction)
+        slot = (x * self.height + y) * 4 + d
+        length = self.rays[slot]
+        if length == self.UNKNOWN:
+            length = self._traceRay(x, y, d)
+        return length
+
+    def _traceRay(self, x, y, d):
+        dx, dy = Actions.directionToVector(self.DIRECTIONS[d])
+        dx, dy = int(dx), int(dy)
+        cells = []
+        nextx, nexty = x + dx, y + dy
+        while not self.walls[nextx][nexty]:
+            cells.append((nextx, nexty))
+            nextx, nexty = nextx + dx, nexty + dy
+        length = len(cells)
+        self.rays[(x * self.height + y) * 4 + d] = length
+        for i, (cx, cy) in enumerate(cells):
+            self.rays[(cx * self.height + cy) * 4 + d] = length - i - 1
+        return length
+
+    def isVisibleFrom(self, ghostPos, pacPos, pacDirection):
+        if pacDirection not in self.DIRECTIONS: return False
+        x, y = [int(c) for c in pacPos]
+        if self.walls[x][y]: return False
+        dx, dy = Actions.directionToVector(pacDirection)
+        gx, gy = ghostPos
+        if dx == 0:
+            if gx != x: return False
+            offset = (gy - y) * dy
+        else:
+            if gy != y: return False
+            offset = (gx - x) * dx
+        # Half-cell steps up to and including the one next to the wall
+        return 0 < offset and offset * 2 == int(offset * 2) and offset <= self.getRayLength(x, y, pacDirection) + 0.5
+
 def getLayout(name, back = 2):
+    """
+    Loads a layout by name from layouts/ or the current directory, or from up
+    to 'back' parent directories of either.
+    """
     if name.endswith('.lay'):
-        layout = tryToLoad('layouts/' + name)
-        if layout == None: layout = tryToLoad(name)
+        candidates = ['layouts/' + name, name]
     else:
-        layout = tryToLoad('layouts/' + name + '.lay')
-        if layout == None: layout = tryToLoad(name + '.lay')
-    if layout == None and back >= 0:
-        curdir = os.path.abspath('.')
-        os.chdir('..')
-        layout = getLayout(name, back -1)
-        os.chdir(curdir)
-    return layout
+        candidates = ['layouts/' + name + '.lay', name + '.lay']
+    for level in range(max(back, -1) + 2):
+        for candidate in candidates:
+            layout = tryToLoad(os.path.join(*(['..'] * level + [candidate])))
+            if layout != None: return layout
+    return None
 
 def tryToLoad(fullname):
+    """
+    Returns the Layout in a file, or None if there is no such file.  Each
+    file is compiled once: the CompiledLayout is memoised by the hash of the
+    file and stored in the cache directory (see util.getCacheDirectory).
+    """
     if(not os.path.exists(fullname)): return None
-    f = open(fullname)
-    try: return Layout([line.strip() for line in f])
+    f = open(fullname, 'rb')
+    try: contents = f.read()
     finally: f.close()
+    layoutText = [line.strip() for line in contents.decode().splitlines()]
+    key = hashlib.sha1(contents).hexdigest()
+    compiled = _COMPILED_FILES.get(key)
+    if compiled == None:
+        compiled = _loadCompiledLayout(key)
+        if compiled == None:
+            compiled = compileLayout(layoutText)
+            _saveCompiledLayout(key, compiled)
+        _COMPILED_FILES[key] = compiled
+    return Layout(layoutText, compiled)
+
+def _compiledLayoutPath(key):
+    directory = util.getCacheDirectory()
+    if directory == None: return None
+    return os.path.join(directory, 'layout-%s.bin' % key)
+
+def _loadCompiledLayout(key):
+    path = _compiledLayoutPath(key)
+    if path == None or not os.path.exists(path): return None
+    try:
+        f = open(path, 'rb')
+        try: version, fields = marshal.load(f)
+        finally: f.close()
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != LAYOUT_CACHE_VERSION: return None
+    return CompiledLayout(*fields)
+
+def _saveCompiledLayout(key, compiled):
+    path = _compiledLayoutPath(key)
+    if path == None: return
+    temporary = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        f = open(temporary, 'wb')
+        try: marshal.dump((LAYOUT_CACHE_VERSION, compiled.toTuple()), f)
+        finally: f.close()
+        os.replace(temporary, path)
+    except (IOError, OSError):
+        if os.path.exists(temporary): os.remove(temporary)
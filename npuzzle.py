@@ -0,0 +1,325 @@
+# npuzzle.py
+# ----------
+# The sliding-tile puzzle on 3x3 (eight puzzle) and 4x4 (fifteen puzzle)
+# boards, with states packed into a single int, and additive pattern
+# database heuristics for it.
+#
+# > python npuzzle.py            # solve a random fifteen puzzle
+# > python npuzzle.py 3 100      # solve an eight puzzle scrambled by 100 moves
+
+import os
+import random
+import sys
+import time
+from collections import deque
+
+import search
+import util
+
+# Module Classes
+
+class NPuzzle:
+    """
+    The mechanics of a size x size sliding-tile puzzle.
+
+    Cells are numbered row by row from the top left, as in the number lists
+    used by eightpuzzle.EightPuzzleState, and 0 is the blank.  A state is an
+    int: the tile in cell i is stored in bits 4i to 4i+3 and the blank's cell
+    index sits above the tiles, in bits 4 * size * size and up.  Moves are
+    'up', 'down', 'left' and 'right' and move the blank; they are looked up in
+    per-cell tables built once per puzzle.
+
+    The goal has the blank in the top left corner followed by the tiles in
+    increasing order.
+    """
+
+    def __init__(self, size):
+        if size not in [3, 4]: raise Exception('Only 3x3 and 4x4 puzzles are supported')
+        self.size = size
+        self.numCells = size * size
+        self.blankShift = 4 * self.numCells
+        self.tileMask = (1 << self.blankShift) - 1
+        self.moves = []
+        for cell in range(self.numCells):
+            row, col = divmod(cell, size)
+            moves = []
+            if row != 0: moves.append(('up', cell - size))
+            if row != size - 1: moves.append(('down', cell + size))
+            if col != 0: moves.append(('left', cell - 1))
+            if col != size - 1: moves.append(('right', cell + 1))
+            self.moves.append(moves)
+        self.goal = self.pack(list(range(self.numCells)))
+
+    def pack(self, numbers):
+        "Packs a row-major list of tiles (0 for the blank) into a state"
+        state = 0
+        for cell, tile in enumerate(numbers):
+            state |= tile << (4 * cell)
+        return state | (numbers.index(0) << self.blankShift)
+
+    def unpack(self, state):
+        "Returns the row-major list of tiles of a state"
+        return [(state >> (4 * cell)) & 15 for cell in range(self.numCells)]
+
+    def blank(self, state):
+        return state >> self.blankShift
+
+    def isGoal(self, state):
+        return state == self.goal
+
+    def legalMoves(self, state):
+        return [move for move, cell in self.moves[state >> self.blankShift]]
+
+    def result(self, state, move):
+        """
+        Returns the state reached by moving the blank.  Illegal moves raise an
+        exception.
+        """
+        blank = state >> self.blankShift
+        for legalMove, cell in self.moves[blank]:
+            if legalMove == move:
+                return self._slide(state, blank, cell)
+        raise Exception('Illegal move: ' + str(move))
+
+    def successors(self, state):
+        "Returns a list of (nextState, move) pairs"
+        blank = state >> self.blankShift
+        return [(self._slide(state, blank, cell), move) for move, cell in self.moves[blank]]
+
+    def _slide(self, state, blank, cell):
+        # The blank's nibble is 0, so xor moves the tile and clears its old cell.
+        tile = (state >> (4 * cell)) & 15
+        tiles = (state & self.tileMask) ^ (tile << (4 * cell)) ^ (tile << (4 * blank))
+        return tiles | (cell << self.blankShift)
+
+    def positions(self, state):
+        "Returns a list mapping each tile to the cell it occupies"
+        positions = [0] * self.numCells
+        for cell in range(self.numCells):
+            positions[(state >> (4 * cell)) & 15] = cell
+        return positions
+
+    def randomState(self, moves=100):
+        "Scrambles the goal with 'moves' random legal moves"
+        state = self.goal
+        for i in range(moves):
+            state = self.result(state, random.choice(self.legalMoves(state)))
+        return state
+
+    def toString(self, state):
+        width = 2 if self.size == 3 else 3
+        horizontalLine = '-' * ((width + 2) * self.size + 1)
+        lines = [horizontalLine]
+        tiles = self.unpack(state)
+        for row in range(self.size):
+            rowLine = '|'
+            for tile in tiles[row * self.size:(row + 1) * self.size]:
+                rowLine = rowLine + (' ' if tile == 0 else str(tile)).rjust(width) + ' |'
+            lines.append(rowLine)
+            lines.append(horizontalLine)
+        return '\n'.join(lines)
+
+class NPuzzleSearchProblem(search.SearchProblem):
+    """
+      A SearchProblem for an NPuzzle.  States are the packed ints of the
+      puzzle and every move costs 1.
+    """
+    def __init__(self, puzzle, startState):
+        self.puzzle = puzzle
+        self.startState = startState
+        self.heuristicInfo = {}
+        self._expanded = 0
+
+    def getStartState(self):
+        return self.startState
+
+    def isGoalState(self, state):
+        return state == self.puzzle.goal
+
+    def expand(self, state):
+        self._expanded += 1
+        return [(child, move, 1) for child, move in self.puzzle.successors(state)]
+
+    def reverseExpand(self, state):
+        # Every move is undone by the opposite move.
+        self._expanded += 1
+        return [(parent, REVERSE_MOVE[move], 1) for parent, move in self.puzzle.successors(state)]
+
+    def getGoalStates(self):
+        return [self.puzzle.goal]
+
+    def getActions(self, state):
+        return self.puzzle.legalMoves(state)
+
+    def getActionCost(self, state, action, next_state):
+        assert next_state == self.puzzle.result(state, action), (
+            "getActionCost() called on incorrect next state.")
+        return 1
+
+    def getNextState(self, state, action):
+        return self.puzzle.result(state, action)
+
+    def getCostOfActionSequence(self, actions):
+        return len(actions)
+
+REVERSE_MOVE = {'up': 'down', 'down': 'up', 'left': 'right', 'right': 'left'}
+
+# Pattern databases
+
+DEFAULT_PARTITIONS = {3: [(1, 2, 4, 5), (3, 6, 7, 8)],
+                      4: [(1, 2, 3, 6, 7), (4, 5, 8, 9, 12), (10, 11, 13, 14, 15)]}
+
+class PatternDatabase:
+    """
+    The exact number of moves of the pattern tiles needed to bring them home,
+    for every placement of those tiles.  Moves of other tiles are free, so the
+    values of disjoint patterns can be added and remain admissible.
+
+    The table is a bytes object indexed by sum(cell of pattern[i] * n**i),
+    where n is the number of cells.
+    """
+    def __init__(self, puzzle, pattern, table):
+        self.puzzle = puzzle
+        self.pattern = tuple(pattern)
+        self.table = table
+        self.weights = [puzzle.numCells ** i for i in range(len(pattern))]
+
+    def getValue(self, state):
+        return self.lookup(self.puzzle.positions(state))
+
+    def lookup(self, positions):
+        "The database value given a list mapping each tile to its cell"
+        index = 0
+        for tile, weight in zip(self.pattern, self.weights):
+            index += positions[tile] * weight
+        return self.table[index]
+
+class AdditivePatternDatabase:
+    "The sum of several PatternDatabases over disjoint sets of tiles."
+    def __init__(self, databases):
+        self.databases = databases
+        self.puzzle = databases[0].puzzle
+
+    def getValue(self, state):
+        positions = self.puzzle.positions(state)
+        return sum([database.lookup(positions) for database in self.databases])
+
+def buildPatternDatabase(puzzle, pattern):
+    """
+    Builds a PatternDatabase by retrograde breadth-first search from the goal.
+
+    The abstract states are the cells of the pattern tiles plus the cell of
+    the blank.  Sliding a pattern tile costs 1 and sliding any other tile
+    costs 0, so the search is a 0-1 BFS over a deque.  Each entry of the
+    database is the minimum over all blank cells.
+    """
+    n = puzzle.numCells
+    k = len(pattern)
+    tileWeights = [n ** (i + 1) for i in range(k)] # the blank has weight 1
+    neighbors = [[cell for move, cell in puzzle.moves[blank]] for blank in range(n)]
+    distances = bytearray(b'\xff') * (n ** (k + 1))
+    goal = sum([tile * weight for tile, weight in zip(pattern, tileWeights)])
+    distances[goal] = 0
+    frontier = deque([goal])
+    while frontier:
+        index = frontier.popleft()
+        distance = distances[index]
+        blank = index % n
+        rest = index // n
+        occupied = {}
+        for i in range(k):
+            rest, cell = divmod(rest, n)
+            occupied[cell] = i
+        base = index - blank
+        for cell in neighbors[blank]:
+            i = occupied.get(cell)
+            if i == None:
+                child = base + cell
+                if distances[child] > distance:
+                    distances[child] = distance
+                    frontier.appendleft(child)
+            else:
+                child = base + cell + (blank - cell) * tileWeights[i]
+                if distances[child] > distance + 1:
+                    distances[child] = distance + 1
+                    frontier.append(child)
+    table = bytes([min(distances[i:i + n]) for i in range(0, len(distances), n)])
+    return PatternDatabase(puzzle, pattern, table)
+
+_DATABASES = {}
+
+def loadPatternDatabase(size, pattern):
+    """
+    Returns the PatternDatabase for the given tiles of a size x size puzzle.
+    Databases are memoised per process and stored as raw bytes in the cache
+    directory (see util.getCacheDirectory), so each one is built only once.
+    """
+    pattern = tuple(pattern)
+    key = (size, pattern)
+    if key in _DATABASES:
+        return _DATABASES[key]
+    puzzle = NPuzzle(size)
+    expectedSize = puzzle.numCells ** len(pattern)
+    directory = util.getCacheDirectory()
+    path = None
+    database = None
+    if directory != None:
+        path = os.path.join(directory, 'pdb-%d-%s.bin' % (size, '-'.join([str(t) for t in pattern])))
+        if os.path.exists(path):
+            f = open(path, 'rb')
+            try: table = f.read()
+            finally: f.close()
+            if len(table) == expectedSize:
+                database = PatternDatabase(puzzle, pattern, table)
+    if database == None:
+        database = buildPatternDatabase(puzzle, pattern)
+        if path != None:
+            temporary = '%s.%d.tmp' % (path, os.getpid())
+            try:
+                f = open(temporary, 'wb')
+                try: f.write(database.table)
+                finally: f.close()
+                os.replace(temporary, path)
+            except (IOError, OSError):
+                if os.path.exists(temporary): os.remove(temporary)
+    _DATABASES[key] = database
+    return database
+
+def loadAdditivePatternDatabase(size, partition=None):
+    """
+    Returns an AdditivePatternDatabase over a partition of the tiles of a
+    size x size puzzle (by default DEFAULT_PARTITIONS[size]).
+    """
+    if partition == None:
+        partition = DEFAULT_PARTITIONS[size]
+    return AdditivePatternDatabase([loadPatternDatabase(size, pattern) for pattern in partition])
+
+def patternDatabaseHeuristic(state, problem):
+    """
+    The additive pattern database heuristic for an NPuzzleSearchProblem.  The
+    database is loaded on first use and kept in problem.heuristicInfo.
+    """
+    database = problem.heuristicInfo.get('patternDatabase')
+    if database == None:
+        database = loadAdditivePatternDatabase(problem.puzzle.size)
+        problem.heuristicInfo['patternDatabase'] = database
+    return database.getValue(state)
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    moves = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    puzzle = NPuzzle(size)
+    start = puzzle.randomState(moves)
+    print('A random puzzle:')
+    print(puzzle.toString(start))
+
+    startTime = time.time()
+    database = loadAdditivePatternDatabase(size)
+    print('Pattern databases ready in %.1f seconds' % (time.time() - startTime))
+
+    problem = NPuzzleSearchProblem(puzzle, start)
+    problem.heuristicInfo['patternDatabase'] = database
+    startTime = time.time()
+    path = search.idaStar(problem, patternDatabaseHeuristic)
+    print('IDA* found a path of %d moves in %.1f seconds (%d nodes expanded)' % (
+        len(path), time.time() - startTime, problem._expanded))
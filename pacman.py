@@ -41,6 +41,7 @@ The keys are 'a', 's', 'd', and 'w' to move (or arrow keys).  Have fun!
 """
 from game import GameStateData
 from game import Game
+from game import Configuration
 from game import Directions
 from game import Actions
 from util import nearestPoint
@@ -71,12 +72,16 @@ class GameState:
     # Accessor methods: use these to access state data #
     ####################################################
 
-    # static variable keeps track of which states have had getLegalActions called
-    explored = set()
+    # static variable: an ExploredStates that generateChild reports the states
+    # it touches to, or None (the default) to skip that bookkeeping
+    explored = None
+    def setExploredTracking(explored):
+        GameState.explored = explored
+    setExploredTracking = staticmethod(setExploredTracking)
+
     def getAndResetExplored():
-        tmp = GameState.explored.copy()
-        GameState.explored = set()
-        return tmp
+        if GameState.explored == None: return set()
+        return GameState.explored.getAndReset()
     getAndResetExplored = staticmethod(getAndResetExplored)
 
     def getLegalActions( self, agentIndex=0 ):
@@ -112,7 +117,7 @@ class GameState:
         if agentIndex == 0:
             state.data.scoreChange += -TIME_PENALTY # Penalty for waiting around
         else:
-            GhostRules.decrementTimer( state.data.agentStates[agentIndex] )
+            GhostRules.decrementTimer( state.data.getAgentStateForUpdate(agentIndex) )
 
         # Resolve multi-agent effects
         GhostRules.checkDeath( state, agentIndex )
@@ -120,8 +125,9 @@ class GameState:
         # Book keeping
         state.data._agentMoved = agentIndex
         state.data.score += state.data.scoreChange
-        GameState.explored.add(self)
-        GameState.explored.add(state)
+        if GameState.explored != None:
+            GameState.explored.add(self)
+            GameState.explored.add(state)
         return state
 
     def getLegalPacmanActions( self ):
@@ -174,7 +180,7 @@ class GameState:
         return self.data.capsules
 
     def getNumFood( self ):
-        return self.data.food.count()
+        return self.data.getNumFood()
 
     def getFood(self):
         """
@@ -253,6 +259,52 @@ class GameState:
         """
         self.data.initialize(layout, numGhostAgents)
 
+class ExploredStates:
+    """
+    Collects the GameStates passed through generateChild, for tests and
+    instrumentation; install one with GameState.setExploredTracking.
+
+    maxStates caps the number of distinct states kept, and states offered
+    after that are only counted.  With sampleRate below 1 each state is kept
+    with that probability, drawn from a private generator so that games play
+    out the same whether or not they are tracked.
+    """
+    def __init__( self, maxStates=None, sampleRate=1.0, seed=0 ):
+        self.maxStates = maxStates
+        self.sampleRate = sampleRate
+        self.random = random.Random(seed)
+        self.reset()
+
+    def add( self, state ):
+        self.numOffered += 1
+        if self.sampleRate < 1.0 and self.random.random() >= self.sampleRate: return
+        if self.maxStates != None and len(self.states) >= self.maxStates: return
+        self.states.add(state)
+
+    def reset( self ):
+        self.states = set()
+        self.numOffered = 0
+
+    def getAndReset( self ):
+        states = self.states
+        self.reset()
+        return states
+
+    def __len__( self ):
+        return len(self.states)
+
+def parseExploredTracking( spec ):
+    """
+    Returns the ExploredStates described by 'all', 'bounded:N' or
+    'sampled:P', or None for 'off'.
+    """
+    if spec == None or spec == 'off': return None
+    if spec == 'all': return ExploredStates()
+    mode, _, value = spec.partition(':')
+    if mode == 'bounded': return ExploredStates(maxStates=int(value))
+    if mode == 'sampled': return ExploredStates(sampleRate=float(value))
+    raise Exception('Explored state tracking not understood: ' + spec)
+
 ############################################################################
 #                     THE HIDDEN SECRETS OF PACMAN                         #
 #                                                                          #
@@ -342,7 +394,7 @@ class PacmanRules:
         if action not in legal:
             raise Exception("Illegal action " + str(action))
 
-        pacmanState = state.data.agentStates[0]
+        pacmanState = state.data.getAgentStateForUpdate(0)
 
         # Update Configuration
         vector = Actions.directionToVector( action, PacmanRules.PACMAN_SPEED )
@@ -361,21 +413,19 @@ class PacmanRules:
         # Eat food
         if state.data.food[x][y]:
             state.data.scoreChange += 10
-            state.data.food = state.data.food.copy()
-            state.data.food[x][y] = False
+            state.data.eatFood( x, y )
             state.data._foodEaten = position
-            # TODO: cache numFood?
             numFood = state.getNumFood()
             if numFood == 0 and not state.data._lose:
                 state.data.scoreChange += 500
                 state.data._win = True
         # Eat capsule
         if( position in state.getCapsules() ):
-            state.data.capsules.remove( position )
+            state.data.eatCapsule( position )
             state.data._capsuleEaten = position
             # Reset all ghosts' scared timers
             for index in range( 1, len( state.data.agentStates ) ):
-                state.data.agentStates[index].scaredTimer = SCARED_TIME
+                state.data.getAgentStateForUpdate(index).scaredTimer = SCARED_TIME
     consume = staticmethod( consume )
 
 class GhostRules:
@@ -404,7 +454,7 @@ class GhostRules:
         if action not in legal:
             raise Exception("Illegal ghost action " + str(action))
 
-        ghostState = state.data.agentStates[ghostIndex]
+        ghostState = state.data.getAgentStateForUpdate(ghostIndex)
         speed = GhostRules.GHOST_SPEED
         if ghostState.scaredTimer > 0: speed /= 2.0
         vector = Actions.directionToVector( action, speed )
@@ -414,7 +464,9 @@ class GhostRules:
     def decrementTimer( ghostState):
         timer = ghostState.scaredTimer
         if timer == 1:
-            ghostState.configuration.pos = nearestPoint( ghostState.configuration.pos )
+            # Configurations are shared between states, so replace it.
+            configuration = ghostState.configuration
+            ghostState.configuration = Configuration( nearestPoint( configuration.pos ), configuration.direction )
         ghostState.scaredTimer = max( 0, timer - 1 )
     decrementTimer = staticmethod( decrementTimer )
 
@@ -435,10 +487,12 @@ class GhostRules:
 
     def collide( state, ghostState, agentIndex):
         if ghostState.scaredTimer > 0:
+            ghostState = state.data.getAgentStateForUpdate(agentIndex)
             state.data.scoreChange += 200
             GhostRules.placeGhost(state, ghostState)
             ghostState.scaredTimer = 0
             # Added for first-person
+            state.data._eaten = state.data._eaten[:]
             state.data._eaten[agentIndex] = True
         else:
             if not state.data._win:
@@ -523,6 +577,12 @@ def readCommand( argv ):
                       help='Turns on exception handling and timeouts during games', default=False)
     parser.add_option('--timeout', dest='timeout', type='int',
                       help=default('Maximum length of time an agent can spend computing in a single game'), default=30)
+    parser.add_option('--explored', dest='explored',
+                      help=default('Track the states each game generates: off, all, bounded:N or sampled:P'), default='off')
+    parser.add_option('-j', '--jobs', dest='jobs', type='int',
+                      help=default('Number of processes to play games in (graphics are turned off when > 1)'), default=1)
+    parser.add_option('--searchStats', dest='searchStats',
+                      help='Append the statistics of every search an agent runs to this file, one JSON object per line', default=None)
 
     options, otherjunk = parser.parse_args(argv)
     if len(otherjunk) != 0:
@@ -532,6 +592,11 @@ def readCommand( argv ):
     # Fix the random seed
     if options.fixRandomSeed: random.seed('cs188')
 
+    # Export search statistics
+    if options.searchStats != None:
+        import search
+        search.setSearchObserver(search.JsonLinesSearchObserver(options.searchStats))
+
     # Choose a layout
     args['layout'] = layout.getLayout( options.layout )
     if args['layout'] == None: raise Exception("The layout " + options.layout + " cannot be found")
@@ -570,6 +635,8 @@ def readCommand( argv ):
     args['record'] = options.record
     args['catchExceptions'] = options.catchExceptions
     args['timeout'] = options.timeout
+    args['jobs'] = options.jobs
+    args['explored'] = parseExploredTracking(options.explored)
 
     # Special case: recorded games don't use the runGames method or args structure
     if options.gameToReplay != None:
@@ -625,9 +692,18 @@ def replayGame( layout, actions, display ):
 
     display.finish()
 
-def runGames( layout, pacman, ghosts, display, numGames, record, numTraining = 0, catchExceptions=False, timeout=30 ):
+def runGames( layout, pacman, ghosts, display, numGames, record, numTraining = 0, catchExceptions=False, timeout=30, jobs=1, explored=None ):
+    """
+    Plays numGames games, the first numTraining of them quietly, and prints
+    a summary of the others.  'explored' is an ExploredStates that is reset
+    at the start of every game; explored-state tracking is off without one.
+    """
     import __main__
     __main__.__dict__['_display'] = display
+    GameState.setExploredTracking(explored)
+
+    if jobs > 1 and numGames - numTraining > 1:
+        return runGamesInParallel(layout, pacman, ghosts, display, numGames, record, numTraining, catchExceptions, timeout, jobs)
 
     rules = ClassicGameRules(timeout)
     games = []
@@ -643,28 +719,119 @@ def runGames( layout, pacman, ghosts, display, numGames, record, numTraining = 0
             gameDisplay = display
             rules.quiet = False
         game = rules.newGame( layout, pacman, ghosts, gameDisplay, beQuiet, catchExceptions)
+        if explored != None: explored.reset()
         game.run()
+        if explored != None: game.numExplored = len(explored)
         if not beQuiet: games.append(game)
 
-        if record:
-            import time, pickle
-            fname = ('recorded-game-%d' % (i + 1)) +  '-'.join([str(t) for t in time.localtime()[1:6]])
-            f = open(fname, 'wb')
-            components = {'layout': layout, 'actions': game.moveHistory}
-            pickle.dump(components, f)
-            f.close()
+        if record: recordGame(layout, game.moveHistory, i)
 
     if (numGames-numTraining) > 0:
-        scores = [game.state.getScore() for game in games]
-        wins = [game.state.isWin() for game in games]
-        winRate = wins.count(True)/ float(len(wins))
-        print('Average Score:', sum(scores) / float(len(scores)))
-        print('Scores:       ', ', '.join([str(score) for score in scores]))
-        print('Win Rate:      %d/%d (%.2f)' % (wins.count(True), len(wins), winRate))
-        print('Record:       ', ', '.join([ ['Loss', 'Win'][int(w)] for w in wins]))
+        printSummary([game.state.getScore() for game in games], [game.state.isWin() for game in games])
+        if explored != None: printExplored([game.numExplored for game in games])
 
     return games
 
+def recordGame( layout, moveHistory, i ):
+    import time, pickle
+    fname = ('recorded-game-%d' % (i + 1)) +  '-'.join([str(t) for t in time.localtime()[1:6]])
+    f = open(fname, 'wb')
+    components = {'layout': layout, 'actions': moveHistory}
+    pickle.dump(components, f)
+    f.close()
+
+def printSummary( scores, wins ):
+    winRate = wins.count(True)/ float(len(wins))
+    print('Average Score:', sum(scores) / float(len(scores)))
+    print('Scores:       ', ', '.join([str(score) for score in scores]))
+    print('Win Rate:      %d/%d (%.2f)' % (wins.count(True), len(wins), winRate))
+    print('Record:       ', ', '.join([ ['Loss', 'Win'][int(w)] for w in wins]))
+
+def printExplored( counts ):
+    print('Explored:     ', ', '.join([str(count) for count in counts]))
+
+class GameResult:
+    """
+    A game played by a runGamesInParallel worker, small enough to send back
+    to the parent process.  It has the attributes of a finished Game that
+    callers of runGames read: state (the final GameState), moveHistory,
+    numMoves, totalAgentTimes, agentTimeout, agentCrashed and gameOver, plus
+    numExplored when explored states are tracked.  The agents, display and
+    rules stay in the worker.
+    """
+    def __init__( self, index, game ):
+        self.index = index
+        self.state = game.state
+        self.moveHistory = game.moveHistory
+        self.numMoves = game.numMoves
+        self.totalAgentTimes = game.totalAgentTimes
+        self.agentTimeout = game.agentTimeout
+        self.agentCrashed = game.agentCrashed
+        self.gameOver = game.gameOver
+        if GameState.explored != None: self.numExplored = len(GameState.explored)
+
+# The game components of a runGamesInParallel worker, set by _initGameWorker.
+_workerArgs = None
+
+def _initGameWorker( args ):
+    global _workerArgs
+    import __main__, textDisplay
+    _workerArgs = args
+    __main__.__dict__['_display'] = textDisplay.NullGraphics()
+
+def _runGameInWorker( task ):
+    import copy, textDisplay
+    index, seed = task
+    layout, pacman, ghosts, catchExceptions, timeout = _workerArgs
+    # Every game starts from the parent's agents, whichever worker plays it.
+    pacman, ghosts = copy.deepcopy((pacman, ghosts))
+    random.seed(seed)
+    rules = ClassicGameRules(timeout)
+    game = rules.newGame( layout, pacman, ghosts, textDisplay.NullGraphics(), True, catchExceptions)
+    if GameState.explored != None: GameState.explored.reset()
+    game.run()
+    return GameResult(index, game)
+
+def runGamesInParallel( layout, pacman, ghosts, display, numGames, record, numTraining, catchExceptions, timeout, jobs ):
+    """
+    Plays the games of runGames on a pool of 'jobs' worker processes, each
+    with NullGraphics.  Training games are still played here, in order, so
+    the workers start from the trained agent.
+
+    Each game gets its own seed, drawn from the random module before the
+    pool starts, so --fixRandomSeed makes a batch reproducible whatever the
+    number of jobs.  Results come back in game order and are summarised as
+    in runGames.  Returns a list of GameResults, which stand in for the
+    Games that runGames returns.
+    """
+    import multiprocessing
+    if numTraining > 0:
+        runGames(layout, pacman, ghosts, display, numTraining, False, numTraining, catchExceptions, timeout, explored=GameState.explored)
+    seeds = [random.getrandbits(64) for i in range(numGames - numTraining)]
+    # Forked workers inherit the agents, which need not be picklable.
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+    workerArgs = (layout, pacman, ghosts, catchExceptions, timeout)
+    pool = context.Pool(min(jobs, len(seeds)), _initGameWorker, (workerArgs,))
+    results = []
+    try:
+        tasks = [(numTraining + i, seed) for i, seed in enumerate(seeds)]
+        for result in pool.imap(_runGameInWorker, tasks):
+            score = result.state.getScore()
+            if result.state.isWin(): print("Pacman emerges victorious! Score: %d" % score)
+            else: print("Pacman died! Score: %d" % score)
+            if record: recordGame(layout, result.moveHistory, result.index)
+            results.append(result)
+    finally:
+        pool.terminate()
+        pool.join()
+
+    printSummary([result.state.getScore() for result in results], [result.state.isWin() for result in results])
+    if GameState.explored != None: printExplored([result.numExplored for result in results])
+    return results
+
 if __name__ == '__main__':
     """
     The main function called when pacman.py is run
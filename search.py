@@ -17,8 +17,11 @@ In search.py, you will implement generic search algorithms which are called by
 Pacman agents (in searchAgents.py).
 """
 
+import time
 import util
 
+REVERSE_PUSH = False # Push children in reverse order (used by searchTestClasses)
+
 class SearchProblem:
     """
     This class outlines the structure of a search problem, but doesn't implement
@@ -52,6 +55,24 @@ class SearchProblem:
         """
         util.raiseNotDefined()
 
+    def reverseExpand(self, state):
+        """
+          state: Search state
+
+        The reverse of expand: returns a list of triples, (parent, action,
+        stepCost), such that taking 'action' in 'parent' leads to 'state' at
+        an incremental cost of 'stepCost'.  Problems that implement this and
+        getGoalStates are reversible and can be solved by bidirectionalSearch.
+        """
+        util.raiseNotDefined()
+
+    def getGoalStates(self):
+        """
+        Returns a list of every goal state, the starting points of a search
+        that runs backwards with reverseExpand.
+        """
+        util.raiseNotDefined()
+
     def getActions(self, state):
         """
           state: Search state
@@ -89,6 +110,164 @@ class SearchProblem:
         util.raiseNotDefined()
 
 
+class SearchStats:
+    """
+    What one search did: nodes generated (pushed onto the frontier) and
+    expanded, the largest the frontier and closed set grew, children and
+    popped nodes discarded because their state was already closed, nodes
+    dropped to stay within a memory limit, heuristic calls, and wall time in
+    seconds.  Heuristic time is only measured while
+    an observer is installed (see setSearchObserver).
+    """
+    FIELDS = ['algorithm', 'nodesGenerated', 'nodesExpanded', 'peakFrontier', 'peakClosed',
+              'duplicatesPruned', 'nodesDropped', 'heuristicCalls', 'heuristicTime', 'wallTime',
+              'pathLength']
+
+    def __init__(self, algorithm):
+        self.algorithm = algorithm
+        self.nodesGenerated = 0
+        self.nodesExpanded = 0
+        self.peakFrontier = 0
+        self.peakClosed = 0
+        self.duplicatesPruned = 0
+        self.nodesDropped = 0
+        self.heuristicCalls = 0
+        self.heuristicTime = 0.0
+        self.wallTime = 0.0
+        self.pathLength = None
+
+    def timeHeuristic(self, heuristic):
+        "Wraps a heuristic so that its calls are added to heuristicTime"
+        def timed(state, problem):
+            start = time.perf_counter()
+            try:
+                return heuristic(state, problem)
+            finally:
+                self.heuristicTime += time.perf_counter() - start
+        return timed
+
+    def asDict(self):
+        return dict([(field, getattr(self, field)) for field in self.FIELDS])
+
+    def __str__(self):
+        return ('%s: %d expanded, %d generated, peak frontier %d, peak closed %d, '
+                '%d duplicates pruned, %d heuristic calls, %.3f seconds') % (
+                self.algorithm, self.nodesExpanded, self.nodesGenerated, self.peakFrontier,
+                self.peakClosed, self.duplicatesPruned, self.heuristicCalls, self.wallTime)
+
+class SearchObserver:
+    """
+    Receives the SearchStats of every search once it finishes.  This default
+    observer does nothing, and while it is installed the searches skip the
+    per-call heuristic timing, so the counters are all they pay for.
+    """
+    enabled = False
+
+    def searchFinished(self, problem, stats):
+        pass
+
+class SearchStatsRecorder(SearchObserver):
+    "Keeps the SearchStats of every search in self.stats."
+    enabled = True
+
+    def __init__(self):
+        self.stats = []
+
+    def searchFinished(self, problem, stats):
+        self.stats.append(stats)
+
+class JsonLinesSearchObserver(SearchObserver):
+    """
+    Appends one JSON object per search to a file, with the SearchStats
+    fields plus the problem class and the process id.  Each line is
+    written in a single call, so parallel workers can share the file.
+    """
+    enabled = True
+
+    def __init__(self, path):
+        self.path = path
+
+    def searchFinished(self, problem, stats):
+        import json, os
+        record = stats.asDict()
+        record['problem'] = problem.__class__.__name__
+        record['pid'] = os.getpid()
+        handle = open(self.path, 'a')
+        try:
+            handle.write(json.dumps(record) + '\n')
+        finally:
+            handle.close()
+
+_observer = SearchObserver()
+
+def setSearchObserver(observer):
+    """
+    Installs the observer that depthFirstSearch, breadthFirstSearch and
+    aStarSearch report to; None restores the no-op default.  Returns the
+    previous observer.
+    """
+    global _observer
+    previous = _observer
+    if observer == None: observer = SearchObserver()
+    _observer = observer
+    return previous
+
+def getSearchObserver():
+    return _observer
+
+def _finishSearch(problem, stats, startTime, path):
+    "Records the wall time and path, then reports stats to the observer"
+    stats.wallTime = time.perf_counter() - startTime
+    if path != None: stats.pathLength = len(path)
+    problem._searchStats = stats
+    if _observer.enabled: _observer.searchFinished(problem, stats)
+    if path == None: return []
+    return path
+
+def _pathTo(node):
+    "Follows (state, action, parent, cost) nodes back to the start"
+    actions = []
+    while node[2] != None:
+        actions.append(node[1])
+        node = node[2]
+    actions.reverse()
+    return actions
+
+def _unorderedSearch(problem, frontier, algorithm):
+    """
+    Graph search for depthFirstSearch and breadthFirstSearch: the frontier
+    decides the order, the goal test happens when a node is popped, and a
+    state is expanded at most once.
+    """
+    startTime = time.perf_counter()
+    stats = SearchStats(algorithm)
+    closed = set()
+    frontier.push((problem.getStartState(), None, None, 0))
+    generated, pruned, peakFrontier = 1, 0, 1
+    path = None
+    while not frontier.isEmpty():
+        node = frontier.pop()
+        state = node[0]
+        if state in closed:
+            pruned += 1
+            continue
+        if problem.isGoalState(state):
+            path = _pathTo(node)
+            break
+        closed.add(state)
+        children = problem.expand(state)
+        if REVERSE_PUSH: children = children[::-1]
+        for child, action, cost in children:
+            if child in closed:
+                pruned += 1
+                continue
+            frontier.push((child, action, node, 0))
+            generated += 1
+        if len(frontier) > peakFrontier: peakFrontier = len(frontier)
+    stats.nodesGenerated, stats.nodesExpanded = generated, len(closed)
+    stats.peakFrontier, stats.peakClosed, stats.duplicatesPruned = peakFrontier, len(closed), pruned
+    return _finishSearch(problem, stats, startTime, path)
+
 def tinyMazeSearch(problem):
     """
     Returns a sequence of moves that solves tinyMaze.  For any other maze, the
@@ -101,24 +280,23 @@ def tinyMazeSearch(problem):
 
 def depthFirstSearch(problem):
     """
-    Search the deepest nodes in the search tree first.
+    Search the deepest nodes in the search tree first.  This is a graph
+    search: each state is expanded at most once, and the goal test is made
+    when a node is popped, so the plan returned need not be the shortest.
 
-    Your search algorithm needs to return a list of actions that reaches the
-    goal. Make sure to implement a graph search algorithm.
-
-    To get started, you might want to try some of these simple commands to
-    understand the search problem that is being passed in:
-
-    print("Start:", problem.getStartState())
-    print("Is the start a goal?", problem.isGoalState(problem.getStartState()))
+    Returns a list of actions, or [] if no goal is reachable.  The search
+    reports a SearchStats to the installed observer and leaves it in
+    problem._searchStats.
     """
-    "*** YOUR CODE HERE ***"
-    util.raiseNotDefined()
+    return _unorderedSearch(problem, util.Stack(), 'depthFirstSearch')
 
 def breadthFirstSearch(problem):
-    """Search the shallowest nodes in the search tree first."""
-    "*** YOUR CODE HERE ***"
-    util.raiseNotDefined()
+    """
+    Search the shallowest nodes in the search tree first.  The plan returned
+    has the fewest actions; as for depthFirstSearch, states are expanded at
+    most once and the SearchStats are left in problem._searchStats.
+    """
+    return _unorderedSearch(problem, util.Queue(), 'breadthFirstSearch')
 
 def nullHeuristic(state, problem=None):
     """
@@ -128,12 +306,959 @@ def nullHeuristic(state, problem=None):
     return 0
 
 def aStarSearch(problem, heuristic=nullHeuristic):
-    """Search the node that has the lowest combined cost and heuristic first."""
-    "*** YOUR CODE HERE ***"
-    util.raiseNotDefined()
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+    Ties are broken first-in first-out.  With a consistent heuristic the
+    plan returned is optimal; returns [] if no goal is reachable, and
+    leaves the SearchStats in problem._searchStats.
+    """
+    return _bestFirstSearch(problem, heuristic, 'aStarSearch')
+
+def uniformCostSearch(problem):
+    """
+    Search the node of least total cost first: aStarSearch with the
+    nullHeuristic, so the plan returned is the cheapest.
+    """
+    return _bestFirstSearch(problem, nullHeuristic, 'uniformCostSearch')
+
+def _bestFirstSearch(problem, heuristic, algorithm):
+    """
+    Graph search for aStarSearch and uniformCostSearch.  A state may be
+    pushed again when a cheaper path to it is found; the stale entries are
+    skipped when popped.  This lazy util.PriorityQueue is used rather than
+    util.IndexedPriorityQueue's decrease-key because the indexed queue
+    hashes a state on every sift, which is expensive for Grid food states:
+    A* ran 1.2-1.8 times slower with it on bigMaze, openMaze and
+    trickySearch.
+    """
+    startTime = time.perf_counter()
+    stats = SearchStats(algorithm)
+    informed = heuristic != nullHeuristic
+    if _observer.enabled and informed: heuristic = stats.timeHeuristic(heuristic)
+    closed = set()
+    frontier = util.PriorityQueue()
+    start = problem.getStartState()
+    frontier.push((start, None, None, 0), heuristic(start, problem))
+    generated, pruned, peakFrontier = 1, 0, 1
+    path = None
+    while not frontier.isEmpty():
+        node = frontier.pop()
+        state, g = node[0], node[3]
+        if state in closed:
+            pruned += 1
+            continue
+        if problem.isGoalState(state):
+            path = _pathTo(node)
+            break
+        closed.add(state)
+        children = problem.expand(state)
+        if REVERSE_PUSH: children = children[::-1]
+        for child, action, cost in children:
+            if child in closed:
+                pruned += 1
+                continue
+            childG = g + cost
+            frontier.push((child, action, node, childG), childG + heuristic(child, problem))
+            generated += 1
+        if len(frontier.heap) > peakFrontier: peakFrontier = len(frontier.heap)
+    stats.nodesGenerated, stats.nodesExpanded = generated, len(closed)
+    stats.peakFrontier, stats.peakClosed, stats.duplicatesPruned = peakFrontier, len(closed), pruned
+    if informed: stats.heuristicCalls = generated
+    return _finishSearch(problem, stats, startTime, path)
+
+def anytimeAStar(problem, heuristic=nullHeuristic, timeBudget=1.0, w0=2.5, weightStep=0.5):
+    """
+    Anytime repairing A* (ARA*).  The first solution comes from A* with the
+    heuristic inflated by w0, which is found quickly but may cost up to w0
+    times the optimum.  The weight is then lowered by weightStep and the
+    search repaired, reusing its g values and re-expanding only states whose
+    cost improved, until the weight reaches 1 or timeBudget seconds have
+    passed; the best path found so far is returned.  The budget never cuts
+    off the first search, so a path is returned if a goal is reachable.
+
+    problem._suboptimalityBound is set to a factor that the returned path's
+    cost is known to be within of the optimum (1 means optimal), and
+    problem._anytimeSolutions lists (seconds, weight, cost, bound) for
+    every improvement.
+    """
+    startTime = time.perf_counter()
+    stats = SearchStats('anytimeAStar')
+    if _observer.enabled: heuristic = stats.timeHeuristic(heuristic)
+    infinity = float('inf')
+    start = problem.getStartState()
+    # state -> [g, h, parent state, action, is a goal]
+    nodes = {start: [0, heuristic(start, problem), None, None, problem.isGoalState(start)]}
+    goal = None
+    if nodes[start][4]: goal = nodes[start]
+    weight = max(w0, 1.0)
+    # Entries go stale when their state is closed or reached more cheaply;
+    # they are skipped instead of being removed.
+    openList = util.PriorityQueue()
+    openList.push((start, 0), (weight * nodes[start][1], nodes[start][1]))
+    inconsistent = {}
+    problem._anytimeSolutions = []
+    expanded, pruned, peakFrontier, peakClosed = 0, 0, 1, 0
+
+    while True:
+        # Improve the path with the current weight: A* with the heuristic
+        # inflated, closing each state at most once per weight.
+        closed = set()
+        outOfTime = False
+        heap = openList.heap
+        while heap:
+            priority, _, (state, g) = heap[0]
+            if state in closed or nodes[state][0] != g:
+                openList.pop()
+                continue
+            if goal != None and goal[0] <= priority[0]:
+                break
+            if problem._anytimeSolutions and expanded % 64 == 0 and time.perf_counter() - startTime >= timeBudget:
+                outOfTime = True
+                break
+            openList.pop()
+            closed.add(state)
+            expanded += 1
+            for child, action, cost in problem.expand(state):
+                childG = g + cost
+                node = nodes.get(child)
+                if node == None:
+                    node = nodes[child] = [childG, heuristic(child, problem), state, action, problem.isGoalState(child)]
+                elif childG < node[0]:
+                    node[0], node[2], node[3] = childG, state, action
+                else:
+                    pruned += 1
+                    continue
+                if node[4] and (goal == None or childG <= goal[0]): goal = node
+                if child in closed:
+                    inconsistent[child] = True
+                else:
+                    openList.push((child, childG), (childG + weight * node[1], node[1]))
+            if len(heap) > peakFrontier: peakFrontier = len(heap)
+        if len(closed) > peakClosed: peakClosed = len(closed)
+        if goal == None:
+            break
+        if outOfTime:
+            # The incumbent can only have got cheaper, so the last bound holds
+            problem._anytimeSolutions.append((time.perf_counter() - startTime, weight, goal[0], problem._suboptimalityBound))
+            break
+
+        # The optimum is at least the smallest g + h among the states still
+        # to be expanded, which bounds how far the incumbent can be from it.
+        queued = dict(inconsistent)
+        for priority, _, (state, g) in heap:
+            if state not in closed and nodes[state][0] == g: queued[state] = True
+        lowerBound = infinity
+        for state in queued:
+            node = nodes[state]
+            if node[0] + node[1] < lowerBound: lowerBound = node[0] + node[1]
+        if goal[0] <= lowerBound:
+            bound = 1.0
+        elif lowerBound <= 0:
+            bound = weight
+        else:
+            bound = min(weight, goal[0] / float(lowerBound))
+        problem._anytimeSolutions.append((time.perf_counter() - startTime, weight, goal[0], bound))
+        problem._suboptimalityBound = bound
+        if bound <= 1.0 or time.perf_counter() - startTime >= timeBudget:
+            break
+
+        # Lower the weight and requeue the open and inconsistent states.
+        weight = max(1.0, weight - weightStep)
+        openList = util.PriorityQueue()
+        for state in queued:
+            node = nodes[state]
+            openList.push((state, node[0]), (node[0] + weight * node[1], node[1]))
+        inconsistent = {}
+
+    stats.nodesGenerated, stats.nodesExpanded = len(nodes), expanded
+    stats.peakFrontier, stats.peakClosed, stats.duplicatesPruned = peakFrontier, peakClosed, pruned
+    if heuristic != nullHeuristic: stats.heuristicCalls = len(nodes)
+    path = None
+    if goal != None:
+        path = []
+        node = goal
+        while node[2] != None:
+            path.append(node[3])
+            node = nodes[node[2]]
+        path.reverse()
+    return _finishSearch(problem, stats, startTime, path)
+
+def beamSearch(problem, heuristic=nullHeuristic, width=100):
+    """
+    Beam search: breadth-first, one layer at a time, but only the width
+    children of each layer with the lowest g + h are kept and the rest are
+    dropped for good.  Memory is bounded by width times the depth, and the
+    path returned is the first one found to reach a goal, which need not be
+    the cheapest; if every route to a goal is dropped, [] is returned.
+
+    The number of dropped nodes is stored in problem._droppedNodes.
+    """
+    import heapq
+    startTime = time.perf_counter()
+    stats = SearchStats('beamSearch')
+    if _observer.enabled: heuristic = stats.timeHeuristic(heuristic)
+    start = problem.getStartState()
+    visited = set([start])
+    layer = [(start, 0, None, None)] # (state, g, parent node, action)
+    generated, pruned, dropped, calls = 1, 0, 0, 0
+    peakFrontier = 1
+    goal = None
+    if problem.isGoalState(start): goal = layer[0]
+    while layer and goal == None:
+        children = {}
+        for node in layer:
+            stats.nodesExpanded += 1
+            for child, action, cost in problem.expand(node[0]):
+                childG = node[1] + cost
+                if child in visited or (child in children and children[child][1] <= childG):
+                    pruned += 1
+                    continue
+                children[child] = (child, childG, node, action)
+                generated += 1
+                if problem.isGoalState(child):
+                    goal = children[child]
+                    break
+            if goal != None: break
+        if len(children) > peakFrontier: peakFrontier = len(children)
+        if len(children) > width:
+            calls += len(children)
+            ranked = [(node[1] + heuristic(state, problem), count, node) for count, (state, node) in enumerate(children.items())]
+            layer = [node for f, count, node in heapq.nsmallest(width, ranked)]
+            dropped += len(children) - width
+        else:
+            layer = list(children.values())
+        for node in layer:
+            visited.add(node[0])
+    problem._droppedNodes = dropped
+    stats.nodesGenerated, stats.peakFrontier, stats.peakClosed = generated, peakFrontier, len(visited)
+    stats.duplicatesPruned, stats.nodesDropped = pruned, dropped
+    if heuristic != nullHeuristic: stats.heuristicCalls = calls
+    path = None
+    if goal != None:
+        path = []
+        node = goal
+        while node[2] != None:
+            path.append(node[3])
+            node = node[2]
+        path.reverse()
+    return _finishSearch(problem, stats, startTime, path)
+
+class _SMANode:
+    "A search tree node of smaStar."
+    __slots__ = ['state', 'g', 'f', 'parent', 'action', 'depth', 'children', 'forgotten', 'expanded', 'alive']
+
+    def __init__(self, state, g, f, parent, action, depth):
+        self.state, self.g, self.f = state, g, f
+        self.parent, self.action, self.depth = parent, action, depth
+        self.children = {} # state -> child node, for the children in memory
+        self.forgotten = {} # state -> backed-up f, for the children dropped
+        self.expanded = False
+        self.alive = True
+
+def smaStar(problem, heuristic=nullHeuristic, maxNodes=10000, maxTableSize=100000):
+    """
+    Simplified memory-bounded A* (SMA*).  It runs A* over a search tree of
+    at most maxNodes nodes.  When the tree is full, the leaf with the highest
+    f (the shallowest among ties) is dropped, and its parent remembers that
+    f.  The parent is expanded again when the lowest remembered f becomes
+    the best in the tree, and regenerates just the children with that f.
+
+    A child's f is at least its parent's, and once a node has been expanded
+    its f is backed up to the lowest f among its children, in memory or
+    forgotten; so f values only rise, up to the root.  Nodes at depth
+    maxNodes - 1 that are not goals cannot lie on a path that fits and get
+    an infinite f.  When the root's f is infinite no solution fits, and []
+    is returned.  With enough memory for the cheapest path, that path is
+    returned.
+
+    A transposition table outside the tree maps states to the lowest g and
+    depth they were reached with and the state they were reached from.  A
+    child reached with a g and depth no lower is pruned, unless it is being
+    regenerated from that same state, so each state is searched below one
+    parent only.  The table holds at most maxTableSize states.
 
+    The number of dropped nodes is stored in problem._droppedNodes.
+    """
+    import heapq
+    startTime = time.perf_counter()
+    stats = SearchStats('smaStar')
+    if _observer.enabled: heuristic = stats.timeHeuristic(heuristic)
+    infinity = float('inf')
+    maxNodes = max(maxNodes, 2)
+    start = problem.getStartState()
+    root = _SMANode(start, 0, heuristic(start, problem), None, None, 0)
+    table = {start: (0, 0, None)}
+    size = 1
+
+    # Nodes that can be expanded (never expanded, or with children to
+    # regenerate) are in 'queued' with their priorities and in a best-first
+    # heap; leaves that can be dropped are in a worst-first heap.  Heap
+    # entries that no longer match are stale and skipped, and the heaps are
+    # rebuilt when mostly stale.
+    queued = {}
+    best, worst = [], []
+    counter = [0]
+    def enqueue(node):
+        if node.expanded and not node.forgotten:
+            queued.pop(node, None)
+            return
+        priority = node.f
+        if node.expanded: priority = min(node.forgotten.values())
+        queued[node] = priority
+        counter[0] += 1
+        heapq.heappush(best, (priority, -node.depth, counter[0], node))
+    def offerLeaf(node):
+        if node.children or node.parent == None: return
+        counter[0] += 1
+        heapq.heappush(worst, (-node.f, node.depth, counter[0], node))
+    def backUp(node):
+        "Raises node's f to the lowest f of its children, then its ancestors'"
+        while node != None:
+            lowest = infinity
+            for child in node.children.values():
+                if child.f < lowest: lowest = child.f
+            for f in node.forgotten.values():
+                if f < lowest: lowest = f
+            if lowest <= node.f: return
+            node.f = lowest
+            offerLeaf(node)
+            node = node.parent
+
+    enqueue(root)
+    generated, pruned, dropped, calls, expanded, peakFrontier, peakSize = 1, 0, 0, 1, 0, 1, 1
+    goal = None
+    while best and root.f < infinity:
+        priority, _, _, node = heapq.heappop(best)
+        if queued.get(node) != priority: continue
+        if priority == infinity: break
+        if not node.expanded and problem.isGoalState(node.state):
+            goal = node
+            break
+        expanded += 1
+        if node.expanded:
+            regenerate = dict([(state, f) for state, f in node.forgotten.items() if f == priority])
+            for state in regenerate: del node.forgotten[state]
+        else:
+            regenerate = None
+            node.expanded = True
+        onPath = set()
+        ancestor = node
+        while ancestor != None:
+            onPath.add(ancestor.state)
+            ancestor = ancestor.parent
+        for child, action, cost in problem.expand(node.state):
+            if regenerate != None and child not in regenerate: continue
+            childG, childDepth = node.g + cost, node.depth + 1
+            known = table.get(child)
+            if child in onPath or (known != None and known[0] <= childG and known[1] <= childDepth
+                                   and known != (childG, childDepth, node.state)):
+                pruned += 1
+                continue
+            if known != None or len(table) < maxTableSize:
+                table[child] = (childG, childDepth, node.state)
+            calls += 1
+            childF = max(node.f, childG + heuristic(child, problem))
+            if regenerate != None: childF = max(childF, regenerate[child])
+            if node.depth + 1 >= maxNodes - 1 and not problem.isGoalState(child):
+                childF = infinity
+            childNode = _SMANode(child, childG, childF, node, action, childDepth)
+            node.children[child] = childNode
+            size += 1
+            generated += 1
+            enqueue(childNode)
+            offerLeaf(childNode)
+        enqueue(node)
+        offerLeaf(node)
+        backUp(node)
+        if size > peakSize: peakSize = size
+
+        # Drop the worst leaves until the tree fits again.
+        while size > maxNodes and worst:
+            negF, _, _, leaf = heapq.heappop(worst)
+            if not leaf.alive or leaf.children or -negF != leaf.f: continue
+            leaf.alive = False
+            queued.pop(leaf, None)
+            parent = leaf.parent
+            del parent.children[leaf.state]
+            size -= 1
+            dropped += 1
+            parent.forgotten[leaf.state] = leaf.f
+            enqueue(parent)
+            offerLeaf(parent)
+
+        if len(best) > 4 * len(queued) + 64:
+            best = [entry for entry in best if queued.get(entry[3]) == entry[0]]
+            heapq.heapify(best)
+        if len(worst) > 4 * size + 64:
+            worst = [entry for entry in worst if entry[3].alive and not entry[3].children and -entry[0] == entry[3].f]
+            heapq.heapify(worst)
+        if len(queued) > peakFrontier: peakFrontier = len(queued)
+
+    problem._droppedNodes = dropped
+    stats.nodesGenerated, stats.nodesExpanded, stats.peakFrontier = generated, expanded, peakFrontier
+    stats.peakClosed, stats.duplicatesPruned, stats.nodesDropped = peakSize, pruned, dropped
+    if heuristic != nullHeuristic: stats.heuristicCalls = calls
+    path = None
+    if goal != None:
+        path = []
+        node = goal
+        while node.parent != None:
+            path.append(node.action)
+            node = node.parent
+        path.reverse()
+    return _finishSearch(problem, stats, startTime, path)
+
+def idaStar(problem, heuristic=nullHeuristic, maxTableSize=100000):
+    """
+    Iterative-deepening A*: repeated depth-first searches bounded by
+    f = g + h, raising the bound to the smallest f that exceeded it.  Memory
+    is linear in the solution depth plus a transposition table.
+
+    The table maps states to the cheapest g reached in the current
+    iteration, and later visits with an equal or larger g are pruned.  It
+    holds at most maxTableSize states and is cleared between iterations.
+
+    Returns a list of actions, or [] if no goal is reachable.  The number of
+    nodes expanded in each iteration is stored in
+    problem._expandedPerIteration.
+    """
+    start = problem.getStartState()
+    bound = heuristic(start, problem)
+    problem._expandedPerIteration = []
+    while True:
+        table = {start: 0}
+        onPath = set([start])
+        actions = []
+        stack = [[start, 0, None]]
+        expanded = 0
+        nextBound = float('inf')
+        while stack:
+            frame = stack[-1]
+            state, g, children = frame
+            if children == None:
+                f = g + heuristic(state, problem)
+                if f > bound:
+                    nextBound = min(nextBound, f)
+                    children = iter(())
+                elif problem.isGoalState(state):
+                    problem._expandedPerIteration.append(expanded)
+                    return actions
+                else:
+                    children = iter(problem.expand(state))
+                    expanded += 1
+                frame[2] = children
+            for child, action, cost in children:
+                childG = g + cost
+                if child in onPath or table.get(child, childG + 1) <= childG:
+                    continue
+                if child in table or len(table) < maxTableSize:
+                    table[child] = childG
+                stack.append([child, childG, None])
+                onPath.add(child)
+                actions.append(action)
+                break
+            else:
+                stack.pop()
+                onPath.discard(state)
+                if stack: actions.pop()
+        problem._expandedPerIteration.append(expanded)
+        if nextBound == float('inf'):
+            return []
+        bound = nextBound
+
+def recursiveBestFirstSearch(problem, heuristic=nullHeuristic, maxTableSize=100000):
+    """
+    Recursive best-first search (RBFS).  It explores the best child while its
+    backed-up f value stays below the best alternative anywhere above it, and
+    forgets subtrees it abandons.  Memory is linear in the solution depth
+    plus a transposition table.
+
+    The table maps states to the cheapest g reached so far and the state
+    they were reached from.  A child is pruned if it was reached with a
+    smaller g, or with the same g from another parent, so each state is
+    searched below one parent only and revisiting a forgotten subtree does
+    not prune the subtree itself.  It holds at most maxTableSize states.
+
+    Returns a list of actions, or [] if no goal is reachable.  Each descent
+    from the start state into one of its children counts as an iteration; the
+    nodes expanded in each one are stored in problem._expandedPerIteration.
+    """
+    import sys
+    start = problem.getStartState()
+    table = {start: (0, None)}
+    onPath = set([start])
+    counter = [0]
+    problem._expandedPerIteration = []
+    infinity = float('inf')
+
+    def search(state, g, f, fLimit, depth):
+        if problem.isGoalState(state):
+            return [], f
+        counter[0] += 1
+        children = []
+        for child, action, cost in problem.expand(state):
+            childG = g + cost
+            if child in onPath:
+                continue
+            best = table.get(child)
+            if best != None and (best[0] < childG or (best[0] == childG and best[1] != state)):
+                continue
+            if best != None or len(table) < maxTableSize:
+                table[child] = (childG, state)
+            children.append([max(childG + heuristic(child, problem), f), childG, child, action])
+        if not children:
+            return None, infinity
+        while True:
+            children.sort(key=lambda entry: entry[0])
+            best = children[0]
+            if best[0] > fLimit or best[0] == infinity:
+                return None, best[0]
+            alternative = children[1][0] if len(children) > 1 else infinity
+            onPath.add(best[2])
+            result, best[0] = search(best[2], best[1], best[0], min(fLimit, alternative), depth + 1)
+            onPath.discard(best[2])
+            if depth == 0:
+                problem._expandedPerIteration.append(counter[0])
+                counter[0] = 0
+            if result != None:
+                return [best[3]] + result, best[0]
+
+    oldLimit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(oldLimit, 20000))
+    try:
+        result, _ = search(start, 0, heuristic(start, problem), infinity, 0)
+    finally:
+        sys.setrecursionlimit(oldLimit)
+    if result == None:
+        return []
+    return result
+
+def bidirectionalSearch(problem, heuristic=nullHeuristic, backwardHeuristic=nullHeuristic, unitCost=False):
+    """
+    Searches forwards from the start state and backwards from the goal
+    states at the same time, and stops once the two searches have met on a
+    path that is provably optimal.  The problem must be reversible: it has to
+    implement reverseExpand and getGoalStates (see SearchProblem).
+
+    With unitCost=True every step is assumed to cost 1 and the search is a
+    bidirectional breadth-first search that expands whole layers of the
+    smaller frontier.  Otherwise it runs MM: each direction orders its
+    frontier by max(g + h, 2g) and the direction with the lower minimum is
+    expanded.  heuristic estimates the cost to a goal, backwardHeuristic
+    estimates the cost from the start state; both must be admissible.
+
+    Returns a list of actions, or [] if no goal is reachable.
+    """
+    start = problem.getStartState()
+    goals = problem.getGoalStates()
+    if problem.isGoalState(start):
+        return []
+    if unitCost:
+        return _bidirectionalBreadthFirst(problem, start, goals)
+    return _meetInTheMiddle(problem, start, goals, heuristic, backwardHeuristic)
+
+def _joinPaths(meet, forwardParents, backwardParents):
+    "Builds the action list of the path start -> meet -> goal"
+    actions = []
+    state = meet
+    while forwardParents[state] != None:
+        state, action = forwardParents[state]
+        actions.append(action)
+    actions.reverse()
+    state = meet
+    while backwardParents[state] != None:
+        state, action = backwardParents[state]
+        actions.append(action)
+    return actions
+
+def _bidirectionalBreadthFirst(problem, start, goals):
+    forward = {start: None}         # state -> (parent, action)
+    backward = dict([(goal, None) for goal in goals])  # state -> (child, action)
+    forwardDepth = {start: 0}
+    backwardDepth = dict([(goal, 0) for goal in goals])
+    forwardLayer, backwardLayer = [start], list(goals)
+    while forwardLayer and backwardLayer:
+        best, meet = None, None
+        if len(forwardLayer) <= len(backwardLayer):
+            nextLayer = []
+            for state in forwardLayer:
+                for child, action, cost in problem.expand(state):
+                    if child in forward: continue
+                    forward[child] = (state, action)
+                    forwardDepth[child] = forwardDepth[state] + 1
+                    nextLayer.append(child)
+                    if child in backward:
+                        length = forwardDepth[child] + backwardDepth[child]
+                        if best == None or length < best: best, meet = length, child
+            forwardLayer = nextLayer
+        else:
+            nextLayer = []
+            for state in backwardLayer:
+                for parent, action, cost in problem.reverseExpand(state):
+                    if parent in backward: continue
+                    backward[parent] = (state, action)
+                    backwardDepth[parent] = backwardDepth[state] + 1
+                    nextLayer.append(parent)
+                    if parent in forward:
+                        length = forwardDepth[parent] + backwardDepth[parent]
+                        if best == None or length < best: best, meet = length, parent
+            backwardLayer = nextLayer
+        if meet != None:
+            return _joinPaths(meet, forward, backward)
+    return []
+
+class _MMFrontier:
+    """
+    One direction of an MM search: the open and closed g values, the parent
+    links, and lazily-cleaned heaps giving the minimum priority, f and g of the
+    open list.
+    """
+    def __init__(self, roots, heuristic):
+        import heapq
+        self.heapq = heapq
+        self.heuristic = heuristic
+        self.g = {}
+        self.parents = {}
+        self.closed = set()
+        self.byPriority, self.byF, self.byG = [], [], []
+        self.count = 0
+        for root in roots:
+            self.add(root, 0, None)
+
+    def add(self, state, g, parent):
+        self.g[state] = g
+        self.parents[state] = parent
+        self.closed.discard(state)
+        f = g + self.heuristic(state)
+        self.count += 1
+        self.heapq.heappush(self.byPriority, (max(f, 2 * g), self.count, state, g))
+        self.heapq.heappush(self.byF, (f, self.count, state, g))
+        self.heapq.heappush(self.byG, (g, self.count, state, g))
+
+    def _top(self, heap):
+        while heap:
+            _, _, state, g = heap[0]
+            if state not in self.closed and self.g[state] == g:
+                return heap[0]
+            self.heapq.heappop(heap)
+        return None
+
+    def minimum(self, heap):
+        top = self._top(heap)
+        if top == None: return float('inf')
+        return top[0]
+
+    def pop(self):
+        top = self._top(self.byPriority)
+        self.heapq.heappop(self.byPriority)
+        self.closed.add(top[2])
+        return top[2]
+
+    def isEmpty(self):
+        return self._top(self.byPriority) == None
+
+def _meetInTheMiddle(problem, start, goals, heuristic, backwardHeuristic):
+    forward = _MMFrontier([start], lambda state: heuristic(state, problem))
+    backward = _MMFrontier(goals, lambda state: backwardHeuristic(state, problem))
+    best, meet = float('inf'), None
+    while not forward.isEmpty() and not backward.isEmpty():
+        forwardPriority = forward.minimum(forward.byPriority)
+        backwardPriority = backward.minimum(backward.byPriority)
+        lowerBound = max(min(forwardPriority, backwardPriority),
+                         forward.minimum(forward.byF), backward.minimum(backward.byF),
+                         forward.minimum(forward.byG) + backward.minimum(backward.byG))
+        if best <= lowerBound:
+            break
+        if forwardPriority <= backwardPriority:
+            side, other, children = forward, backward, problem.expand
+        else:
+            side, other, children = backward, forward, problem.reverseExpand
+        state = side.pop()
+        g = side.g[state]
+        for neighbor, action, cost in children(state):
+            neighborG = g + cost
+            if neighbor in side.g and side.g[neighbor] <= neighborG:
+                continue
+            side.add(neighbor, neighborG, (state, action))
+            if neighbor in other.g and neighborG + other.g[neighbor] < best:
+                best, meet = neighborG + other.g[neighbor], neighbor
+    if meet == None:
+        return []
+    return _joinPaths(meet, forward.parents, backward.parents)
+
+def jumpPointSearch(problem):
+    """
+    Jump point search: A* specialised to 4-connected grids on which every
+    move costs 1, such as PositionSearchProblem and AnyFoodSearchProblem.
+    It reads problem.walls, problem.getStartState() and
+    problem.getGoalStates() directly instead of calling expand.
+
+    Of the many equally short paths through open space it only considers
+    those that run vertically and branch off horizontally, so straight runs
+    are jumped over and only the cells where such a path can turn (or reach a
+    goal) enter the frontier.  The returned actions spell out every step.
+    Each jump point expanded counts towards problem._expanded, and the
+    search reports a SearchStats like aStarSearch.
+    """
+    import heapq
+    from game import Directions
+    startTime = time.perf_counter()
+    stats = SearchStats('jumpPointSearch')
+
+    # Open cells in a flat array with a border of walls: moving east or west
+    # adds +/-stride to an index, north or south +/-1.
+    walls = problem.walls
+    stride = walls.height + 2
+    free = bytearray(stride * (walls.width + 2))
+    for x in range(walls.width):
+        column, base = walls[x], (x + 1) * stride + 1
+        for y in range(walls.height):
+            if not column[y]: free[base + y] = 1
+    startX, startY = problem.getStartState()
+    start = (startX + 1) * stride + startY + 1
+    goals = set([(x + 1) * stride + y + 1 for x, y in problem.getGoalStates()])
+    goalCoordinates = [divmod(goal, stride) for goal in goals]
+
+    def heuristic(node):
+        x, y = divmod(node, stride)
+        return min([abs(x - gx) + abs(y - gy) for gx, gy in goalCoordinates])
+
+    def jumpHorizontally(node, step):
+        while True:
+            node += step
+            if not free[node]: return None
+            if node in goals: return node
+            if (free[node + 1] and not free[node + 1 - step]) or (free[node - 1] and not free[node - 1 - step]):
+                return node
+
+    def jumpVertically(node, step):
+        while True:
+            node += step
+            if not free[node]: return None
+            if node in goals: return node
+            east, west = free[node + stride], free[node - stride]
+            if (east and not free[node + stride - step]) or (west and not free[node - stride - step]):
+                return node
+            if (east and jumpHorizontally(node, stride) != None) or (west and jumpHorizontally(node, -stride) != None):
+                return node
+
+    # Directions worth jumping in after arriving with a step (None: the start)
+    branches = {None: [stride, -stride, 1, -1],
+                stride: [stride, 1, -1], -stride: [-stride, 1, -1],
+                1: [1, stride, -stride], -1: [-1, stride, -stride]}
+    best = {start: 0}
+    parents = {start: None}
+    closed = set()
+    frontier = [(heuristic(start) if goals else 0, 0, start, None, 0)]
+    generated, pruned, peakFrontier, count = 1, 0, 1, 1
+    goal = None
+    while frontier and goals:
+        _, _, node, arrival, g = heapq.heappop(frontier)
+        if node in closed or best[node] != g:
+            pruned += 1
+            continue
+        if node in goals:
+            goal = node
+            break
+        closed.add(node)
+        if hasattr(problem, '_expanded'): problem._expanded += 1
+        for step in branches[arrival]:
+            if step == stride or step == -stride:
+                jumpPoint = jumpHorizontally(node, step)
+                distance = abs(jumpPoint - node) // stride if jumpPoint != None else 0
+            else:
+                jumpPoint = jumpVertically(node, step)
+                distance = abs(jumpPoint - node) if jumpPoint != None else 0
+            if jumpPoint == None or jumpPoint in closed: continue
+            childG = g + distance
+            if childG >= best.get(jumpPoint, childG + 1): continue
+            best[jumpPoint] = childG
+            parents[jumpPoint] = node
+            heapq.heappush(frontier, (childG + heuristic(jumpPoint), count, jumpPoint, step, childG))
+            count += 1
+            generated += 1
+        if len(frontier) > peakFrontier: peakFrontier = len(frontier)
+    stats.nodesGenerated, stats.nodesExpanded = generated, len(closed)
+    stats.peakFrontier, stats.peakClosed, stats.duplicatesPruned = peakFrontier, len(closed), pruned
+    stats.heuristicCalls = generated
+
+    path = None
+    if goal != None:
+        names = {stride: Directions.EAST, -stride: Directions.WEST, 1: Directions.NORTH, -1: Directions.SOUTH}
+        path = []
+        node = goal
+        while parents[node] != None:
+            parent = parents[node]
+            delta = node - parent
+            if delta % stride == 0:
+                path.extend([names[stride if delta > 0 else -stride]] * (abs(delta) // stride))
+            else:
+                path.extend([names[1 if delta > 0 else -1]] * abs(delta))
+            node = parent
+        path.reverse()
+    return _finishSearch(problem, stats, startTime, path)
+
+class DStarLite:
+    """
+    Incremental shortest paths with D* Lite: the search runs backwards from
+    the goal states and keeps its g and rhs values between queries, so that
+    when the start moves or step costs change, only the part of the search
+    tree those changes affect is repaired.  It pays off when the changes are
+    near the agent and far from the goal (see
+    benchmarks/replanningBenchmark.py).
+
+    The problem must implement expand, reverseExpand and getGoalStates (the
+    initial goals); the nearest goal is planned to.  heuristic(state, start)
+    estimates the cost of reaching state from start and must be consistent,
+    for instance util.manhattanDistance on Pacman positions.
+
+      planner = DStarLite(problem, util.manhattanDistance)
+      actions = planner.getPlan()
+      planner.moveStart(newPosition)
+      planner.updateCosts(cellsWhoseCostChanged)
+      actions = planner.getPlan()
+
+    Goals can also be added and removed, but removing one repairs every state
+    whose nearest goal it was, which usually costs more than a fresh search;
+    ClosestDotSearchAgent's fresh search per dot is cheaper for eating dots.
+
+    self.expansions counts the states popped from the queue over all queries.
+    """
+    def __init__(self, problem, heuristic=None, start=None):
+        if heuristic == None: heuristic = lambda state, start: 0
+        self.problem = problem
+        self.heuristic = heuristic
+        if start == None: start = problem.getStartState()
+        self.start = self.last = start
+        self.goals = set()
+        self.keyModifier = 0
+        self.g, self.rhs = {}, {}
+        self.queue = util.IndexedPriorityQueue()
+        self._successors, self._predecessors = {}, {}
+        self.expansions = 0
+        for goal in problem.getGoalStates():
+            self.addGoal(goal)
+
+    def getG(self, state):
+        return self.g.get(state, float('inf'))
+
+    def getRhs(self, state):
+        return self.rhs.get(state, float('inf'))
+
+    def getCost(self):
+        "The cost of the current plan, or infinity if no goal is reachable"
+        self.computeShortestPath()
+        return self.getG(self.start)
+
+    def successors(self, state):
+        children = self._successors.get(state)
+        if children == None:
+            children = self._successors[state] = self.problem.expand(state)
+        return children
+
+    def predecessors(self, state):
+        parents = self._predecessors.get(state)
+        if parents == None:
+            parents = self._predecessors[state] = self.problem.reverseExpand(state)
+        return parents
+
+    def _key(self, state):
+        best = min(self.getG(state), self.getRhs(state))
+        return (best + self.heuristic(state, self.start) + self.keyModifier, best)
+
+    def _updateState(self, state):
+        if state not in self.goals:
+            best = float('inf')
+            for child, action, cost in self.successors(state):
+                value = cost + self.getG(child)
+                if value < best: best = value
+            self.rhs[state] = best
+        if state in self.queue: self.queue.remove(state)
+        if self.getG(state) != self.getRhs(state):
+            self.queue.push(state, self._key(state))
+
+    def computeShortestPath(self):
+        "Repairs g until the start state is consistent"
+        queue = self.queue
+        while not queue.isEmpty():
+            oldKey, state = queue.peek()
+            if oldKey >= self._key(self.start) and self.getRhs(self.start) == self.getG(self.start):
+                break
+            queue.pop()
+            self.expansions += 1
+            newKey = self._key(state)
+            if oldKey < newKey:
+                queue.push(state, newKey)
+            elif self.getG(state) > self.getRhs(state):
+                self.g[state] = self.rhs[state]
+                for parent, action, cost in self.predecessors(state):
+                    self._updateState(parent)
+            else:
+                self.g[state] = float('inf')
+                self._updateState(state)
+                for parent, action, cost in self.predecessors(state):
+                    self._updateState(parent)
+
+    def getPlan(self):
+        """
+        Returns the actions of a cheapest path from the start to the nearest
+        goal, or [] if there is none.
+        """
+        self.computeShortestPath()
+        if self.getG(self.start) == float('inf'): return []
+        actions = []
+        state = self.start
+        while state not in self.goals:
+            best, bestChild, bestAction = float('inf'), None, None
+            for child, action, cost in self.successors(state):
+                value = cost + self.getG(child)
+                if value < best: best, bestChild, bestAction = value, child, action
+            if bestChild == None: return []
+            actions.append(bestAction)
+            state = bestChild
+        return actions
+
+    def moveStart(self, start):
+        "Moves the start, for instance after the agent has followed part of a plan"
+        self.keyModifier += self.heuristic(self.last, start)
+        self.last = self.start = start
+
+    def addGoal(self, goal):
+        self.goals.add(goal)
+        self.rhs[goal] = 0
+        self._updateState(goal)
+
+    def removeGoal(self, goal):
+        self.goals.discard(goal)
+        self._updateState(goal)
+
+    def updateCosts(self, states):
+        """
+        Reports that the cost of stepping into or out of each of 'states' has
+        changed.  Problems that cache their children (PositionSearchProblem)
+        are told to forget them first.
+        """
+        affected = set()
+        for state in states:
+            affected.add(state)
+            for parent, action, cost in self.predecessors(state):
+                affected.add(parent)
+        for state in affected:
+            self._successors.pop(state, None)
+            self._predecessors.pop(state, None)
+        if hasattr(self.problem, 'forgetChildren'): self.problem.forgetChildren(affected)
+        for state in affected:
+            self._updateState(state)
 
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
+ara = anytimeAStar
+beam = beamSearch
+sma = smaStar
+ucs = uniformCostSearch
+ida = idaStar
+rbfs = recursiveBestFirstSearch
+bidi = bidirectionalSearch
+jps = jumpPointSearch
@@ -37,8 +37,16 @@ Good luck and happy searching!
 from game import Directions
 from game import Agent
 from game import Actions
+from game import BitGrid
 import util
+import array
+import collections
+import hashlib
+import mmap
+import os
+import sys
 import time
+import weakref
 import search
 
 class GoWestAgent(Agent):
@@ -69,14 +77,19 @@ class SearchAgent(Agent):
       depthFirstSearch or dfs
       breadthFirstSearch or bfs
 
+    With a timeBudget (in seconds), fn is ignored and the agent plans with
+    search.anytimeAStar, starting from the heuristic inflated by weight and
+    returning the best path it has when the budget runs out.
+
 
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic', timeBudget=None, weight='2.5'):
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
         # Get the search function from the name and heuristic
+        if timeBudget != None: fn = 'anytimeAStar'
         if fn not in dir(search):
             raise AttributeError(fn + ' is not a search function in search.py.')
         func = getattr(search, fn)
@@ -92,7 +105,12 @@ class SearchAgent(Agent):
                 raise AttributeError(heuristic + ' is not a function in searchAgents.py or search.py.')
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
             # Note: this bit of Python trickery combines the search algorithm and the heuristic
-            self.searchFunction = lambda x: func(x, heuristic=heur)
+            if timeBudget != None:
+                budget, w0 = float(timeBudget), float(weight)
+                print('[SearchAgent] using a time budget of %g seconds and initial weight %g' % (budget, w0))
+                self.searchFunction = lambda x: func(x, heuristic=heur, timeBudget=budget, w0=w0)
+            else:
+                self.searchFunction = lambda x: func(x, heuristic=heur)
 
         # Get the search problem type from the name
         if prob not in globals().keys() or not prob.endswith('Problem'):
@@ -115,7 +133,15 @@ class SearchAgent(Agent):
         self.actions  = self.searchFunction(problem) # Find a path
         totalCost = problem.getCostOfActionSequence(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
-        if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        stats = getattr(problem, '_searchStats', None)
+        if stats != None:
+            print('Search nodes expanded: %d' % stats.nodesExpanded)
+            print('Search stats: %s' % stats)
+        elif '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        bound = getattr(problem, '_suboptimalityBound', None)
+        if bound != None: print('Path cost is within %.3f times the optimum' % bound)
+        if 'getMemoryPerExpandedNode' in dir(problem):
+            print('Food state memory per expanded node: %.1f bytes' % problem.getMemoryPerExpandedNode())
 
     def getAction(self, state):
         """
@@ -141,8 +167,15 @@ class PositionSearchProblem(search.SearchProblem):
 
     The state space consists of (x,y) positions in a pacman game.
 
+    Children are served from a per-layout successor table and each cell's
+    costs are computed once per problem, so costFn should not change after
+    the problem is created.  Set checkActions to False (on the class or an
+    instance) to skip the consistency assertions in getNextState and
+    getActionCost; running python with -O skips them as well.
+
     Note: this search problem is fully specified; you should NOT change it.
     """
+    checkActions = True
 
     def __init__(self, gameState, costFn = lambda x: 1, goal=(1,1), start=None, warn=True, visualize=True):
         """
@@ -164,6 +197,10 @@ class PositionSearchProblem(search.SearchProblem):
         # For display purposes
         self._visited, self._visitedlist, self._expanded = {}, [], 0 # DO NOT CHANGE
 
+        # Successor tables (see getSuccessorTable)
+        self.successors = getSuccessorTable(self.walls)
+        self._children = {}
+
     def getStartState(self):
         return self.startState
 
@@ -192,11 +229,13 @@ class PositionSearchProblem(search.SearchProblem):
          cost of expanding to that child
         """
 
-        children = []
-        for action in self.getActions(state):
-            nextState = self.getNextState(state, action)
-            cost = self.getActionCost(state, action, nextState)
-            children.append( ( nextState, action, cost) )
+        children = self._children.get(state)
+        if children == None:
+            if state in self.successors:
+                children = tuple([(child, action, self.costFn(child)) for child, action in self.successors[state]])
+            else:
+                children = tuple([(child, action, self.costFn(child)) for child, action in self._computeSuccessors(state)])
+            self._children[state] = children
 
         # Bookkeeping for display purposes
         self._expanded += 1 # DO NOT CHANGE
@@ -204,32 +243,72 @@ class PositionSearchProblem(search.SearchProblem):
             self._visited[state] = True
             self._visitedlist.append(state)
 
-        return children
+        return list(children)
+
+    def reverseExpand(self, state):
+        """
+        Returns the cells from which one step leads to state, as (parent,
+        action, cost) triples.  Moves are reversible and the cost of a move is
+        the cost of the cell it enters, so these are the children of state
+        with the actions reversed and the cost costFn(state).
+        """
+        cost = self.costFn(state)
+        if state in self.successors:
+            neighbors = self.successors[state]
+        else:
+            neighbors = self._computeSuccessors(state)
+        parents = [(neighbor, Directions.REVERSE[action], cost) for neighbor, action in neighbors]
+
+        # Bookkeeping for display purposes
+        self._expanded += 1 # DO NOT CHANGE
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return parents
+
+    def getGoalStates(self):
+        return [self.goal]
+
+    def forgetChildren(self, states):
+        "Drops the cached children of states, for callers that change costFn"
+        for state in states:
+            self._children.pop(state, None)
 
     def getActions(self, state):
-        possible_directions = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]
-        valid_actions_from_state = []
-        for action in possible_directions:
-            x, y = state
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                valid_actions_from_state.append(action)
-        return valid_actions_from_state
+        if state in self.successors:
+            return [action for child, action in self.successors[state]]
+        return [action for child, action in self._computeSuccessors(state)]
 
     def getActionCost(self, state, action, next_state):
-        assert next_state == self.getNextState(state, action), (
-            "Invalid next state passed to getActionCost().")
+        if self.checkActions:
+            assert next_state == self.getNextState(state, action), (
+                "Invalid next state passed to getActionCost().")
         return self.costFn(next_state)
 
     def getNextState(self, state, action):
-        assert action in self.getActions(state), (
-            "Invalid action passed to getActionCost().")
+        if self.checkActions:
+            assert action in self.getActions(state), (
+                "Invalid action passed to getActionCost().")
+        for child, childAction in self.successors.get(state, ()):
+            if childAction == action:
+                return child
         x, y = state
         dx, dy = Actions.directionToVector(action)
         nextx, nexty = int(x + dx), int(y + dy)
         return (nextx, nexty)
 
+    def _computeSuccessors(self, state):
+        "Computes the (child, action) pairs of a state missing from the successor table"
+        successors = []
+        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+            x, y = state
+            dx, dy = Actions.directionToVector(action)
+            nextx, nexty = int(x + dx), int(y + dy)
+            if not self.walls[nextx][nexty]:
+                successors.append(((nextx, nexty), action))
+        return successors
+
     def getCostOfActionSequence(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -246,6 +325,32 @@ class PositionSearchProblem(search.SearchProblem):
             cost += self.costFn((x,y))
         return cost
 
+_SUCCESSOR_TABLES = weakref.WeakKeyDictionary()
+
+def getSuccessorTable(walls):
+    """
+    Returns a dict mapping each open cell of walls to a tuple of its
+    (child, action) pairs, in the NORTH, SOUTH, EAST, WEST order used by
+    getActions.  Tables are built once per wall layout and shared by every
+    problem on that layout.
+    """
+    table = _SUCCESSOR_TABLES.get(walls)
+    if table == None:
+        table = {}
+        vectors = [(Directions.NORTH, 0, 1), (Directions.SOUTH, 0, -1),
+                   (Directions.EAST, 1, 0), (Directions.WEST, -1, 0)]
+        for x in range(walls.width):
+            for y in range(walls.height):
+                if walls[x][y]: continue
+                successors = []
+                for action, dx, dy in vectors:
+                    nextx, nexty = x + dx, y + dy
+                    if 0 <= nextx < walls.width and 0 <= nexty < walls.height and not walls[nextx][nexty]:
+                        successors.append(((nextx, nexty), action))
+                table[(x, y)] = tuple(successors)
+        _SUCCESSOR_TABLES[walls] = table
+    return table
+
 class StayEastSearchAgent(SearchAgent):
     """
     An agent for position search with a cost function that penalizes being in
@@ -482,6 +587,58 @@ class FoodSearchProblem:
             cost += 1
         return cost
 
+class CompactFoodSearchProblem(FoodSearchProblem):
+    """
+    A FoodSearchProblem whose states are cheap, immutable keys.
+
+    A search state is still a tuple ( pacmanPosition, foodGrid ), but foodGrid
+    is a BitGrid (see game.py) wrapping an int bitmask of the remaining food.
+    Every food set is interned in self.foodTable, so a child that eats nothing
+    shares its parent's foodGrid and identical food sets reached along
+    different paths share a single object.  foodGrid.asList(), foodGrid.count()
+    and foodGrid[x][y] behave as before, so existing heuristics work unchanged;
+    they must not modify the foodGrid they are given.
+    """
+    def __init__(self, startingGameState):
+        FoodSearchProblem.__init__(self, startingGameState)
+        self.foodTable = {}
+        startFood = BitGrid.fromGrid(startingGameState.getFood())
+        self.start = (self.start[0], self.internFood(startFood))
+
+    def internFood(self, food):
+        "Returns the shared BitGrid holding the same food as food"
+        return self.foodTable.setdefault(food.bits, food)
+
+    def isGoalState(self, state):
+        return state[1].bits == 0
+
+    def getNextState(self, state, action):
+        assert action in self.getActions(state), (
+            "Invalid action passed to getActionCost().")
+        x, y = state[0]
+        dx, dy = Actions.directionToVector(action)
+        nextx, nexty = int(x + dx), int(y + dy)
+        food = state[1]
+        mask = 1 << (nextx * food.height + nexty)
+        if food.bits & mask:
+            bits = food.bits & ~mask
+            nextFood = self.foodTable.get(bits)
+            if nextFood is None:
+                nextFood = BitGrid.fromBits(food.width, food.height, bits)
+                self.foodTable[bits] = nextFood
+            food = nextFood
+        return ((nextx, nexty), food)
+
+    def getMemoryPerExpandedNode(self):
+        """
+        Returns the bytes held by the interned food sets (the BitGrids, their
+        bitmasks and the intern table) divided by the number of expanded nodes.
+        """
+        total = sys.getsizeof(self.foodTable)
+        for bits, food in self.foodTable.items():
+            total += sys.getsizeof(bits) + sys.getsizeof(food) + sys.getsizeof(food.__dict__)
+        return total / float(max(self._expanded, 1))
+
 class AStarFoodSearchAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
     def __init__(self):
@@ -490,35 +647,12 @@ class AStarFoodSearchAgent(SearchAgent):
 
 def foodHeuristic(state, problem):
     """
-    Your heuristic for the FoodSearchProblem goes here.
-
-    This heuristic must be consistent to ensure correctness.  First, try to come
-    up with an admissible heuristic; almost all admissible heuristics will be
-    consistent as well.
-
-    If using A* ever finds a solution that is worse uniform cost search finds,
-    your heuristic is *not* consistent, and probably not admissible!  On the
-    other hand, inadmissible or inconsistent heuristics may find optimal
-    solutions, so be careful.
-
-    The state is a tuple ( pacmanPosition, foodGrid ) where foodGrid is a Grid
-    (see game.py) of either True or False. You can call foodGrid.asList() to get
-    a list of food coordinates instead.
-
-    If you want access to info like walls, capsules, etc., you can query the
-    problem.  For example, problem.walls gives you a Grid of where the walls
-    are.
-
-    If you want to *store* information to be reused in other calls to the
-    heuristic, there is a dictionary called problem.heuristicInfo that you can
-    use. For example, if you only want to count the walls once and store that
-    value, try: problem.heuristicInfo['wallCount'] = problem.walls.count()
-    Subsequent calls to this heuristic can access
-    problem.heuristicInfo['wallCount']
+    The heuristic for the FoodSearchProblem: foodMSTHeuristic, the weight of
+    a maze-distance minimum spanning tree over the remaining food plus the
+    maze distance to the closest dot.  It is consistent, so A* with it stays
+    optimal.
     """
-    position, foodGrid = state
-    "*** YOUR CODE HERE ***"
-    return 0
+    return foodMSTHeuristic(state, problem)
 
 class ClosestDotSearchAgent(SearchAgent):
     "Search for all food using a sequence of searches"
@@ -576,6 +710,12 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         self.startState = gameState.getPacmanPosition()
         self.costFn = lambda x: 1
         self._visited, self._visitedlist, self._expanded = {}, [], 0 # DO NOT CHANGE
+        self.successors = getSuccessorTable(self.walls)
+        self._children = {}
+
+    def getGoalStates(self):
+        "Every cell with food is a goal."
+        return self.food.asList()
 
     def isGoalState(self, state):
         """
@@ -587,11 +727,133 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         "*** YOUR CODE HERE ***"
         util.raiseNotDefined()
 
+class MazeDistanceOracle:
+    """
+    All-pairs shortest path lengths between the open cells of a maze.
+
+    The open cells are numbered in column-major order and the distances are
+    stored in an n x n matrix of unsigned 16-bit ints, filled with one BFS per
+    source cell.  The matrix is written to the cache directory (see
+    util.getCacheDirectory) under a name derived from a hash of the walls, and
+    later runs on the same walls memory-map that file instead of recomputing
+    it.  Oracles are also memoised per process; use
+    MazeDistanceOracle.forWalls(walls) rather than the constructor.
+    """
+    UNREACHABLE = 0xFFFF
+
+    _oracles = {}      # wall key -> oracle
+    _oraclesById = {}  # id(walls) -> (weak reference to walls, oracle)
+
+    def __init__(self, walls, cacheDirectory=None):
+        self.width, self.height = walls.width, walls.height
+        self.cells = [(x, y) for x in range(walls.width) for y in range(walls.height) if not walls[x][y]]
+        self.index = dict([(cell, i) for i, cell in enumerate(self.cells)])
+        self.key = MazeDistanceOracle.wallKey(walls)
+        self.distances = None
+        self._mmap = None
+        if cacheDirectory != None:
+            self.cacheFile = os.path.join(cacheDirectory, 'mazeDistances-%s.bin' % self.key)
+            self.distances = self._load()
+        else:
+            self.cacheFile = None
+        if self.distances is None:
+            self.distances = self._compute(walls)
+            self._save()
+
+    def wallKey(walls):
+        "A hex digest identifying a wall layout (and this machine's byte order)"
+        text = '%s:%s:%s' % (sys.byteorder, walls.width, walls.height)
+        return hashlib.sha1((text + str(walls.packBits())).encode()).hexdigest()
+    wallKey = staticmethod(wallKey)
+
+    def forWalls(walls):
+        """
+        Returns the oracle for a wall Grid, building or loading it the first
+        time a given wall layout is seen in this process.
+        """
+        cached = MazeDistanceOracle._oraclesById.get(id(walls))
+        if cached != None and cached[0]() is walls:
+            return cached[1]
+        key = MazeDistanceOracle.wallKey(walls)
+        oracle = MazeDistanceOracle._oracles.get(key)
+        if oracle == None:
+            oracle = MazeDistanceOracle(walls, util.getCacheDirectory())
+            MazeDistanceOracle._oracles[key] = oracle
+        try:
+            forget = lambda ref, wallsId=id(walls): MazeDistanceOracle._oraclesById.pop(wallsId, None)
+            MazeDistanceOracle._oraclesById[id(walls)] = (weakref.ref(walls, forget), oracle)
+        except TypeError:
+            pass
+        return oracle
+    forWalls = staticmethod(forWalls)
+
+    def getDistance(self, point1, point2):
+        """
+        Returns the maze distance between two open cells, or None if no path
+        connects them.
+        """
+        n = len(self.cells)
+        d = self.distances[self.index[point1] * n + self.index[point2]]
+        if d == MazeDistanceOracle.UNREACHABLE: return None
+        return d
+
+    def _compute(self, walls):
+        n = len(self.cells)
+        neighbors = []
+        for x, y in self.cells:
+            adjacent = [(x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)]
+            neighbors.append([self.index[c] for c in adjacent if c in self.index])
+        distances = array.array('H', [MazeDistanceOracle.UNREACHABLE]) * (n * n)
+        for source in range(n):
+            row = source * n
+            distances[row + source] = 0
+            frontier = [source]
+            depth = 0
+            while frontier:
+                depth += 1
+                nextFrontier = []
+                for cell in frontier:
+                    for neighbor in neighbors[cell]:
+                        if distances[row + neighbor] == MazeDistanceOracle.UNREACHABLE:
+                            distances[row + neighbor] = depth
+                            nextFrontier.append(neighbor)
+                frontier = nextFrontier
+        return distances
+
+    def _load(self):
+        n = len(self.cells)
+        try:
+            f = open(self.cacheFile, 'rb')
+        except (IOError, OSError):
+            return None
+        try:
+            if os.fstat(f.fileno()).st_size != 2 * n * n or n == 0:
+                return None
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            return None
+        finally:
+            f.close()
+        return memoryview(self._mmap).cast('H')
+
+    def _save(self):
+        if self.cacheFile == None: return
+        temporary = '%s.%d.tmp' % (self.cacheFile, os.getpid())
+        try:
+            f = open(temporary, 'wb')
+            try: self.distances.tofile(f)
+            finally: f.close()
+            os.replace(temporary, self.cacheFile)
+        except (IOError, OSError):
+            if os.path.exists(temporary): os.remove(temporary)
+
 def mazeDistance(point1, point2, gameState):
     """
-    Returns the maze distance between any two points, using the search functions
-    you have already built. The gameState can be any game state -- Pacman's
-    position in that state is ignored.
+    Returns the maze distance between any two points.  The gameState can be
+    any game state -- Pacman's position in that state is ignored.
+
+    Distances come from the MazeDistanceOracle for the gameState's walls, so
+    after the first call on a layout every call is a table lookup.
 
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
@@ -602,5 +864,192 @@ def mazeDistance(point1, point2, gameState):
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    return MazeDistanceOracle.forWalls(walls).getDistance(point1, point2)
+
+class FoodMSTHeuristic:
+    """
+    Maze-distance minimum spanning trees over the remaining food of a
+    FoodSearchProblem, for foodMSTHeuristic.
+
+    A tree is (weight, vertices, edges), where vertices are the
+    MazeDistanceOracle indices of the food cells and edges are (u, v, length)
+    triples.  Trees are cached per food set in an LRU keyed by the food
+    bitmask (bit x * height + y, as in BitGrid).  On a miss, if Pacman stands
+    on a cell whose food set with that cell added is cached, the tree is
+    derived from that parent's tree by removing the eaten vertex; otherwise it
+    is built from scratch with Prim's algorithm; on large layouts such as
+    mediumSearch this makes misses several times cheaper (see
+    benchmarks/foodHeuristicBenchmark.py).  Use
+    FoodMSTHeuristic.forProblem(problem), which keeps one engine in
+    problem.heuristicInfo['foodMST'].
+    """
+    def __init__(self, walls, maxEntries=10000, incremental=True):
+        self.oracle = MazeDistanceOracle.forWalls(walls)
+        self.height = walls.height
+        self.maxEntries = maxEntries
+        self.incremental = incremental
+        self.trees = collections.OrderedDict() # food bits -> tree
+        self.hits, self.derived, self.built = 0, 0, 0
+        self.vertexOfBit = [-1] * (walls.width * walls.height)
+        for cell, i in self.oracle.index.items():
+            self.vertexOfBit[cell[0] * walls.height + cell[1]] = i
+
+    def forProblem(problem):
+        "Returns the engine kept in problem.heuristicInfo, creating it on first use"
+        engine = problem.heuristicInfo.get('foodMST')
+        if engine == None:
+            engine = FoodMSTHeuristic(problem.walls)
+            problem.heuristicInfo['foodMST'] = engine
+        return engine
+    forProblem = staticmethod(forProblem)
+
+    def getValue(self, position, food):
+        """
+        Returns the weight of the spanning tree over the food plus the maze
+        distance from position to the closest food.
+        """
+        weight, vertices, edges = self.getTree(self._foodBits(food), position)
+        if not vertices: return 0
+        n = len(self.oracle.cells)
+        distances = self.oracle.distances
+        row = self.oracle.index[position] * n
+        return weight + min([distances[row + v] for v in vertices])
+
+    def getTree(self, bits, position=None):
+        "Returns the tree over the food set bits, with Pacman at position"
+        trees = self.trees
+        tree = trees.get(bits)
+        if tree != None:
+            trees.move_to_end(bits)
+            self.hits += 1
+            return tree
+        if self.incremental and position != None:
+            eaten = 1 << (position[0] * self.height + position[1])
+            parent = None
+            if not bits & eaten:
+                parent = trees.get(bits | eaten)
+            if parent != None:
+                tree = self._removeVertex(parent, self.oracle.index[position])
+                self.derived += 1
+        if tree == None:
+            tree = self._build(self._vertices(bits))
+            self.built += 1
+        trees[bits] = tree
+        if len(trees) > self.maxEntries:
+            trees.popitem(last=False)
+        return tree
+
+    def _foodBits(self, food):
+        if isinstance(food, BitGrid):
+            return food.bits
+        bits = 0
+        for x, y in food.asList():
+            bits |= 1 << (x * self.height + y)
+        return bits
+
+    def _vertices(self, bits):
+        vertices = []
+        while bits:
+            low = bits & -bits
+            vertices.append(self.vertexOfBit[low.bit_length() - 1])
+            bits ^= low
+        return vertices
+
+    def _build(self, vertices):
+        "Prim's algorithm on the complete maze-distance graph, O(k^2)"
+        n = len(self.oracle.cells)
+        distances = self.oracle.distances
+        if not vertices:
+            return (0, vertices, [])
+        row = vertices[0] * n
+        outside = [[distances[row + v], vertices[0], v] for v in vertices[1:]]
+        weight, edges = 0, []
+        while outside:
+            closest = min(outside)
+            outside.remove(closest)
+            length, u, v = closest
+            weight += length
+            edges.append((u, v, length))
+            row = v * n
+            for entry in outside:
+                d = distances[row + entry[2]]
+                if d < entry[0]:
+                    entry[0], entry[1] = d, v
+        return (weight, vertices, edges)
+
+    def _removeVertex(self, tree, vertex):
+        """
+        The tree over the same food less vertex.  Removing vertex splits the
+        tree into one component per tree edge it had; a minimum spanning tree
+        of the rest is the edges that remain plus the cheapest edges that
+        join those components back together.
+        """
+        weight, vertices, edges = tree
+        vertices = [v for v in vertices if v != vertex]
+        kept, neighbors = [], []
+        for edge in edges:
+            if edge[0] == vertex:
+                neighbors.append(edge[1])
+                weight -= edge[2]
+            elif edge[1] == vertex:
+                neighbors.append(edge[0])
+                weight -= edge[2]
+            else:
+                kept.append(edge)
+        if len(neighbors) < 2:
+            return (weight, vertices, kept)
+
+        adjacent = dict([(v, []) for v in vertices])
+        for u, v, length in kept:
+            adjacent[u].append(v)
+            adjacent[v].append(u)
+        components = []
+        for neighbor in neighbors:
+            component, stack, seen = [], [neighbor], set([neighbor])
+            while stack:
+                u = stack.pop()
+                component.append(u)
+                for v in adjacent[u]:
+                    if v not in seen:
+                        seen.add(v)
+                        stack.append(v)
+            components.append(component)
+
+        # Prim's algorithm over the components
+        n = len(self.oracle.cells)
+        distances = self.oracle.distances
+        joined = components[0]
+        outside = [[self._cheapestEdge(joined, c, distances, n), c] for c in components[1:]]
+        while outside:
+            closest = min(outside, key=lambda entry: entry[0][2])
+            outside.remove(closest)
+            edge, component = closest
+            weight += edge[2]
+            kept.append(edge)
+            for entry in outside:
+                candidate = self._cheapestEdge(component, entry[1], distances, n)
+                if candidate[2] < entry[0][2]:
+                    entry[0] = candidate
+        return (weight, vertices, kept)
+
+    def _cheapestEdge(self, component1, component2, distances, n):
+        best = (None, None, MazeDistanceOracle.UNREACHABLE + 1)
+        for u in component1:
+            row = u * n
+            for v in component2:
+                d = distances[row + v]
+                if d < best[2]:
+                    best = (u, v, d)
+        return best
+
+def foodMSTHeuristic(state, problem):
+    """
+    A heuristic for the FoodSearchProblem (or CompactFoodSearchProblem): the
+    weight of a maze-distance minimum spanning tree over the remaining food
+    plus the maze distance to the closest food.  Any path that eats all the
+    food spans Pacman and every dot, so this is admissible, and it is
+    consistent.  The trees are cached by the FoodMSTHeuristic kept in
+    problem.heuristicInfo.
+    """
+    position, foodGrid = state
+    return FoodMSTHeuristic.forProblem(problem).getValue(position, foodGrid)
@@ -72,6 +72,7 @@ class GraphSearch(SearchProblem):
         goals = r.group(1).split()
         self.goals = [str.strip(g) for g in goals]
         self.children = {}
+        self.parents = None
         all_states = set()
         self.orderedChildTuples = []
         for l in lines[2:]:
@@ -108,6 +109,18 @@ class GraphSearch(SearchProblem):
         self.expanded_states.append(state)
         return list(self.children[state])
 
+    # Get all parents of a state, for searches that run backwards
+    def reverseExpand(self, state):
+        if self.parents == None:
+            self.parents = dict([(s, []) for s in self.children])
+            for start, action, next_state, cost in self.orderedChildTuples:
+                self.parents[next_state].append((start, action, cost))
+        self.expanded_states.append(state)
+        return list(self.parents[state])
+
+    def getGoalStates(self):
+        return list(self.goals)
+
     def getActions(self, state):
         children = self.children[state]
         actions = [action for next_state, action, cost in children]
@@ -189,6 +202,17 @@ def parseHeuristic(heuristicText):
 
     return graphHeuristic
 
+# Parses keyword arguments for the search, given as "name=value" pairs
+def parseArguments(argumentText):
+    arguments = {}
+    for token in argumentText.split():
+        name, value = token.split('=')
+        try:
+            arguments[name] = int(value)
+        except ValueError:
+            arguments[name] = float(value)
+    return arguments
+
 
 class GraphSearchTest(testClasses.TestCase):
 
@@ -202,6 +226,7 @@ class GraphSearchTest(testClasses.TestCase):
             self.heuristic = parseHeuristic(testDict['heuristic'])
         else:
             self.heuristic = None
+        self.arguments = parseArguments(testDict.get('arguments', ''))
 
     # Note that the return type of this function is a tripple:
     # (solution, expanded states, error message)
@@ -209,9 +234,9 @@ class GraphSearchTest(testClasses.TestCase):
         alg = getattr(search, self.alg)
         problem = GraphSearch(self.graph_text)
         if self.heuristic != None:
-            solution = alg(problem, self.heuristic)
+            solution = alg(problem, self.heuristic, **self.arguments)
         else:
-            solution = alg(problem)
+            solution = alg(problem, **self.arguments)
 
         if type(solution) != type([]):
             return None, None, 'The result of %s must be a list. (Instead, it is %s)' % (self.alg, type(solution))
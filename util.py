@@ -29,6 +29,7 @@
 import sys
 import inspect
 import heapq, random
+from collections import deque
 
 
 class FixedRandom:
@@ -147,14 +148,23 @@ class Stack:
         "Returns true if the stack is empty"
         return len(self.list) == 0
 
+    def __len__(self):
+        return len(self.list)
+
 class Queue:
-    "A container with a first-in-first-out (FIFO) queuing policy."
+    """
+      A container with a first-in-first-out (FIFO) queuing policy.
+
+      Backed by a collections.deque so that both ends are O(1).  As before,
+      the newest item sits at the left of self.list and the earliest at the
+      right.
+    """
     def __init__(self):
-        self.list = []
+        self.list = deque()
 
     def push(self,item):
         "Enqueue the 'item' into the queue"
-        self.list.insert(0,item)
+        self.list.appendleft(item)
 
     def pop(self):
         """
@@ -167,6 +177,17 @@ class Queue:
         "Returns true if the queue is empty"
         return len(self.list) == 0
 
+    def __len__(self):
+        return len(self.list)
+
+    def extend(self, items):
+        "Enqueue every item of 'items', in order"
+        self.list.extendleft(items)
+
+    def peek(self):
+        "Returns the earliest enqueued item without removing it"
+        return self.list[-1]
+
 class PriorityQueue:
     """
       Implements a priority queue data structure. Each inserted item
@@ -205,6 +226,181 @@ class PriorityQueue:
         else:
             self.push(item, priority)
 
+class IndexedPriorityQueue:
+    """
+      A priority queue with the same push/pop/isEmpty/update interface as
+      PriorityQueue, backed by a binary heap plus a map from each item to its
+      slot in the heap.  The map lets update() find an item in O(1) and move it
+      in O(log n) instead of scanning and re-heapifying the whole frontier.
+
+      Items must be hashable and each item is queued at most once: pushing an
+      item that is already in the queue re-prioritizes it.  Ties are broken by
+      insertion order, exactly like PriorityQueue, so both queues pop items in
+      the same order for the same sequence of pushes and updates.
+    """
+    def __init__(self):
+        self.heap = []
+        self.index = {}
+        self.count = 0
+
+    def push(self, item, priority):
+        if item in self.index:
+            self._reprioritize(self.index[item], priority)
+            return
+        entry = [priority, self.count, item]
+        self.count += 1
+        self.heap.append(entry)
+        self.index[item] = len(self.heap) - 1
+        self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        heap = self.heap
+        last = heap.pop()
+        if heap:
+            entry = heap[0]
+            heap[0] = last
+            self.index[last[2]] = 0
+            self._siftDown(0)
+        else:
+            entry = last
+        del self.index[entry[2]]
+        return entry[2]
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def peek(self):
+        "Returns (priority, item) for the item pop() would return, leaving it queued"
+        entry = self.heap[0]
+        return entry[0], entry[2]
+
+    def remove(self, item):
+        "Removes a queued item"
+        slot = self.index.pop(item)
+        last = self.heap.pop()
+        if slot < len(self.heap):
+            self.heap[slot] = last
+            self.index[last[2]] = slot
+            self._siftUp(slot)
+            self._siftDown(self.index[last[2]])
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update: lower the priority of a queued
+        # item, ignore equal or higher priorities, push unseen items.
+        slot = self.index.get(item)
+        if slot is None:
+            self.push(item, priority)
+        elif priority < self.heap[slot][0]:
+            self.heap[slot][0] = priority
+            self._siftUp(slot)
+
+    def _reprioritize(self, slot, priority):
+        old = self.heap[slot][0]
+        self.heap[slot][0] = priority
+        if priority < old:
+            self._siftUp(slot)
+        elif priority > old:
+            self._siftDown(slot)
+
+    def _siftUp(self, slot):
+        heap, index = self.heap, self.index
+        entry = heap[slot]
+        key = (entry[0], entry[1])
+        while slot > 0:
+            parentSlot = (slot - 1) >> 1
+            parent = heap[parentSlot]
+            if key >= (parent[0], parent[1]):
+                break
+            heap[slot] = parent
+            index[parent[2]] = slot
+            slot = parentSlot
+        heap[slot] = entry
+        index[entry[2]] = slot
+
+    def _siftDown(self, slot):
+        heap, index = self.heap, self.index
+        size = len(heap)
+        entry = heap[slot]
+        key = (entry[0], entry[1])
+        while True:
+            childSlot = 2 * slot + 1
+            if childSlot >= size:
+                break
+            child = heap[childSlot]
+            rightSlot = childSlot + 1
+            if rightSlot < size:
+                right = heap[rightSlot]
+                if (right[0], right[1]) < (child[0], child[1]):
+                    childSlot, child = rightSlot, right
+            if key <= (child[0], child[1]):
+                break
+            heap[slot] = child
+            index[child[2]] = slot
+            slot = childSlot
+        heap[slot] = entry
+        index[entry[2]] = slot
+
+class LazyPriorityQueue:
+    """
+      A priority queue with the same push/pop/isEmpty/update interface as
+      PriorityQueue that never moves entries inside the heap.  Lowering an
+      item's priority pushes a fresh entry and marks the old one as removed;
+      stale entries are skipped when they reach the top of the heap.
+
+      This trades some extra memory for the cheapest possible update: one
+      heappush and one dict write.  Items must be hashable.
+    """
+    REMOVED = object()
+
+    def __init__(self):
+        self.heap = []
+        self.entries = {}
+        self.count = 0
+
+    def push(self, item, priority):
+        if item in self.entries:
+            self.entries.pop(item)[2] = LazyPriorityQueue.REMOVED
+        entry = [priority, self.count, item]
+        self.count += 1
+        self.entries[item] = entry
+        heapq.heappush(self.heap, entry)
+
+    def pop(self):
+        heap = self.heap
+        while heap:
+            _, _, item = heapq.heappop(heap)
+            if item is not LazyPriorityQueue.REMOVED:
+                del self.entries[item]
+                return item
+        raise IndexError('pop from an empty priority queue')
+
+    def isEmpty(self):
+        return len(self.entries) == 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, item):
+        return item in self.entries
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update.  The replacement entry keeps
+        # the original insertion count so ties resolve as they would have.
+        entry = self.entries.get(item)
+        if entry is None:
+            self.push(item, priority)
+        elif priority < entry[0]:
+            entry[2] = LazyPriorityQueue.REMOVED
+            newEntry = [priority, entry[1], item]
+            self.entries[item] = newEntry
+            heapq.heappush(self.heap, newEntry)
+
 class PriorityQueueWithFunction(PriorityQueue):
     """
     Implements a priority queue with the same push/pop signature of the
@@ -590,6 +786,24 @@ def lookup(name, namespace):
         if len(options) > 1: raise Exception('Name conflict for %s')
         raise Exception('%s not found as a method or class' % name)
 
+def getCacheDirectory():
+    """
+    Returns the directory used for on-disk caches (the PACMAN_CACHE_DIR
+    environment variable, or .cache next to this file), creating it if needed.
+    Returns None if the directory cannot be created, in which case callers
+    should keep their caches in memory only.
+    """
+    import os
+    path = os.environ.get('PACMAN_CACHE_DIR')
+    if not path:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+    try:
+        if not os.path.isdir(path):
+            os.makedirs(path)
+    except OSError:
+        return None
+    return path
+
 def pause():
     """
     Pauses the output stream awaiting user feedback.
@@ -599,20 +813,78 @@ def pause():
 
 # code to handle timeouts
 #
-# FIXME
-# NOTE: TimeoutFuncton is NOT reentrant.  Later timeouts will silently
-# disable earlier timeouts.  Could be solved by maintaining a global list
-# of active time outs.  Currently, questions which have test cases calling
-# this have all student code so wrapped.
+# Each thread keeps a stack of active deadlines.  An inner TimeoutFunction
+# never outlives the one around it, and when it returns an expired outer
+# deadline is raised in turn, so nested timeouts stay correct.  The main
+# thread is interrupted by a single SIGALRM handler installed once, and the
+# interval timer is only re-armed when the earliest deadline moves closer.
+# Other threads cannot be interrupted: they check their deadline when the
+# function returns, or cooperatively through checkTimeout.  Calls that must
+# be stopped at the deadline can run in a SubprocessTimeoutFunction.
 #
 import signal
+import threading
 import time
 class TimeoutFunctionException(Exception):
     """Exception to raise on a timeout"""
     pass
 
+class _DeadlineStack(threading.local):
+    def __init__(self):
+        self.deadlines = []
+
+_DEADLINES = _DeadlineStack()
+_ALARM_SUPPORTED = hasattr(signal, 'SIGALRM') and hasattr(signal, 'setitimer')
+_ALARM_INSTALLED = False
+_ALARM_DEADLINE = None # When the armed SIGALRM is due, if one is
+
+def _handleAlarm(signum, frame):
+    global _ALARM_DEADLINE
+    _ALARM_DEADLINE = None
+    deadlines = _DEADLINES.deadlines
+    if len(deadlines) == 0:
+        return
+    if deadlines[-1] <= time.monotonic():
+        raise TimeoutFunctionException()
+    _armAlarm(deadlines[-1])
+
+def _armAlarm(deadline):
+    global _ALARM_INSTALLED, _ALARM_DEADLINE
+    if not _ALARM_INSTALLED:
+        signal.signal(signal.SIGALRM, _handleAlarm)
+        _ALARM_INSTALLED = True
+    _ALARM_DEADLINE = deadline
+    signal.setitimer(signal.ITIMER_REAL, max(deadline - time.monotonic(), 0.0001))
+
+def _usesAlarm():
+    return _ALARM_SUPPORTED and threading.current_thread() is threading.main_thread()
+
+def timeRemaining():
+    """
+    Returns the seconds left before the innermost active deadline of this
+    thread, or None if no TimeoutFunction is running.
+    """
+    deadlines = _DEADLINES.deadlines
+    if len(deadlines) == 0:
+        return None
+    return deadlines[-1] - time.monotonic()
+
+def checkTimeout():
+    """
+    Raises TimeoutFunctionException if this thread's innermost deadline has
+    passed.  Long computations outside the main thread can call this to be
+    cancelled on time.
+    """
+    deadlines = _DEADLINES.deadlines
+    if len(deadlines) > 0 and deadlines[-1] <= time.monotonic():
+        raise TimeoutFunctionException()
 
 class TimeoutFunction:
+    """
+    Calls a function, raising TimeoutFunctionException if it runs longer
+    than 'timeout' seconds or past the deadline of an enclosing
+    TimeoutFunction.
+    """
     def __init__(self, function, timeout):
         self.timeout = timeout
         self.function = function
@@ -621,25 +893,81 @@ class TimeoutFunction:
         raise TimeoutFunctionException()
 
     def __call__(self, *args, **keyArgs):
-        # If we have SIGALRM signal, use it to cause an exception if and
-        # when this function runs too long.  Otherwise check the time taken
-        # after the method has returned, and throw an exception then.
-        if hasattr(signal, 'SIGALRM'):
-            old = signal.signal(signal.SIGALRM, self.handle_timeout)
-            signal.alarm(self.timeout)
-            try:
-                result = self.function(*args, **keyArgs)
-            finally:
-                signal.signal(signal.SIGALRM, old)
-            signal.alarm(0)
-        else:
-            startTime = time.time()
+        deadlines = _DEADLINES.deadlines
+        now = time.monotonic()
+        deadline = now + self.timeout
+        if len(deadlines) > 0 and deadlines[-1] < deadline:
+            deadline = deadlines[-1]
+        if deadline <= now:
+            self.handle_timeout(None, None)
+        usesAlarm = _usesAlarm()
+        deadlines.append(deadline)
+        try:
+            if usesAlarm and (_ALARM_DEADLINE == None or deadline < _ALARM_DEADLINE):
+                _armAlarm(deadline)
             result = self.function(*args, **keyArgs)
-            timeElapsed = time.time() - startTime
-            if timeElapsed >= self.timeout:
-                self.handle_timeout(None, None)
+        finally:
+            deadlines.pop()
+            # A stale alarm is harmless, but an enclosing deadline must be armed.
+            if usesAlarm and len(deadlines) > 0 and (_ALARM_DEADLINE == None or deadlines[-1] < _ALARM_DEADLINE):
+                _armAlarm(deadlines[-1])
+        if time.monotonic() >= deadline:
+            self.handle_timeout(None, None)
         return result
 
+def _callInSubprocess(function, args, keyArgs, connection):
+    global _ALARM_DEADLINE
+    _ALARM_DEADLINE = None # Interval timers are not inherited by the child
+    try:
+        outcome = (True, function(*args, **keyArgs))
+    except BaseException as inst:
+        outcome = (False, inst)
+    try:
+        connection.send(outcome)
+    except Exception:
+        connection.send((False, Exception(str(outcome[1]))))
+    connection.close()
+
+class SubprocessTimeoutFunction(TimeoutFunction):
+    """
+    A TimeoutFunction that runs the function in a forked process and kills
+    it at the deadline, so even code that never returns to the interpreter
+    is stopped.  The result, or the exception raised, is sent back and must
+    be picklable; changes the function makes to objects are lost.  Where fork
+    is unavailable this behaves like TimeoutFunction.
+    """
+    def __call__(self, *args, **keyArgs):
+        import multiprocessing
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            return TimeoutFunction.__call__(self, *args, **keyArgs)
+        timeout = self.timeout
+        remaining = timeRemaining()
+        if remaining != None and remaining < timeout:
+            timeout = remaining
+        if timeout <= 0:
+            self.handle_timeout(None, None)
+        context = multiprocessing.get_context('fork')
+        receiver, sender = context.Pipe(False)
+        process = context.Process(target=_callInSubprocess, args=(self.function, args, keyArgs, sender))
+        process.start()
+        sender.close()
+        try:
+            if not receiver.poll(timeout):
+                self.handle_timeout(None, None)
+            try:
+                succeeded, value = receiver.recv()
+            except EOFError:
+                process.join()
+                raise Exception('Subprocess exited with code %s' % process.exitcode)
+        finally:
+            if process.is_alive():
+                process.kill()
+            process.join()
+            receiver.close()
+        if not succeeded:
+            raise value
+        return value
+
 
 
 _ORIGINAL_STDOUT = None